@@ -0,0 +1,133 @@
+# ===============================================
+# Datei: abgleich.py
+# Diff-basiertes Neu-Erzeugen: pro erzeugtem Dokument wird ein Fingerabdruck
+# der Eingaben im Manifest des Ausgabeordners gespeichert. Bei einem neuen
+# Lauf werden nur Dokumente erzeugt, deren Eingaben sich geändert haben.
+# ===============================================
+import hashlib
+import json
+import os
+import sys
+from datetime import date, datetime
+from functools import lru_cache
+
+import regeln
+
+MANIFEST_NAME = ".manifest.json"
+
+# Quellcode, der das Ergebnis bestimmt: ändert er sich, sind alle Fingerabdrücke neu
+_CODE_DATEIEN = (
+    "arbeitstagebuch_standard_python_skripte_tagesblatt_wochenubersicht.py",
+    "kalender.py",
+    "regeln.py",
+)
+
+
+@lru_cache(maxsize=1)
+def code_stand() -> str:
+    """Hash über die Generator-Quelltexte (einmal pro Prozess berechnet)."""
+    h = hashlib.sha256()
+    basis = os.path.dirname(os.path.abspath(__file__))
+    for name in _CODE_DATEIEN:
+        with open(os.path.join(basis, name), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Nicht serialisierbar: {type(value).__name__}")
+
+
+def fingerabdruck(art: str, kwargs: dict, profil: str | None = None) -> str:
+    """
+    Fingerabdruck eines Dokuments aus allen Eingaben: Art, Generator-Argumente,
+    Inhalt des Regelprofils und Code-Stand. Gleiche Eingaben -> gleicher Wert.
+    """
+    regelwerk = regeln.regelwerk(profil)
+    daten = {
+        "art": art,
+        "kwargs": kwargs,
+        "profil": regeln.profile().get(regelwerk.name),
+        "code": code_stand(),
+    }
+    text = json.dumps(daten, sort_keys=True, ensure_ascii=False, default=_json_default)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class Manifest:
+    """
+    Fingerabdrücke aller erzeugten Dokumente eines Ausgabeordners
+    ({relativer Pfad: Fingerabdruck}), gespeichert als .manifest.json.
+    """
+
+    def __init__(self, ausgabe: str, speichern_alle: int = 200):
+        self.ausgabe = ausgabe
+        self.pfad = os.path.join(ausgabe, MANIFEST_NAME)
+        self.speichern_alle = speichern_alle
+        self._eintraege: dict[str, str] = {}
+        self._ungespeichert = 0
+        try:
+            with open(self.pfad, encoding="utf-8") as f:
+                eintraege = json.load(f)
+            if not isinstance(eintraege, dict):
+                raise ValueError("kein JSON-Objekt")
+            self._eintraege = eintraege
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            # z. B. abgebrochener Schreibvorgang: wie leeres Manifest behandeln -> alles neu erzeugen
+            print(f"Warnung: {self.pfad} unlesbar ({e}), wird neu aufgebaut", file=sys.stderr)
+            self._ungespeichert = 1
+
+    def _key(self, pfad: str) -> str:
+        return os.path.relpath(pfad, self.ausgabe).replace(os.sep, "/")
+
+    def aktuell(self, pfad: str, fp: str) -> bool:
+        """True, wenn das Dokument existiert und mit denselben Eingaben erzeugt wurde."""
+        return self._eintraege.get(self._key(pfad)) == fp and os.path.exists(pfad)
+
+    def pfade(self) -> list[str]:
+        """Pfade aller Dokumente im Manifest."""
+        return [os.path.join(self.ausgabe, *key.split("/")) for key in self._eintraege]
+
+    def entfernen(self, pfad: str):
+        """Löscht ein Dokument samt Manifest-Eintrag."""
+        try:
+            os.remove(pfad)
+        except FileNotFoundError:
+            pass
+        if self._eintraege.pop(self._key(pfad), None) is not None:
+            self._ungespeichert += 1
+
+    def setzen(self, pfad: str, fp: str):
+        self._eintraege[self._key(pfad)] = fp
+        self._ungespeichert += 1
+        if self._ungespeichert >= self.speichern_alle:
+            self.speichern()
+
+    def speichern(self):
+        """Schreibt das Manifest atomar (temporäre Datei + Umbenennen)."""
+        if not self._ungespeichert and os.path.exists(self.pfad):
+            return
+        os.makedirs(self.ausgabe, exist_ok=True)
+        tmp = f"{self.pfad}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._eintraege, f, sort_keys=True, indent=0)
+        os.replace(tmp, self.pfad)
+        self._ungespeichert = 0
+
+    def __len__(self):
+        return len(self._eintraege)
+
+
+def geaendert(auftraege, manifest: Manifest, profil: str | None = None):
+    """
+    Filtert Render-Aufträge (art, pfad, kwargs) auf die geänderten und liefert
+    (art, pfad, kwargs, fingerabdruck). Unveränderte Dokumente entfallen.
+    """
+    for art, pfad, kwargs in auftraege:
+        fp = fingerabdruck(art, kwargs, profil)
+        if not manifest.aktuell(pfad, fp):
+            yield art, pfad, kwargs, fp
@@ -5,7 +5,11 @@
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import mm
-from datetime import datetime
+from datetime import date, datetime
+
+import kalender
+import regeln as regeln_mod
+from regeln import Regelwerk
 
 # ---------- Konstante Layout-Parameter (Tagesblatt) ----------
 TB_TITLE_LEFT = "Arbeitstagebuch"
@@ -47,50 +51,48 @@ def _tb_header_footer(c: canvas.Canvas, kw_label: str, page_num: int = 1):
 def generate_tagesblatt(
     output_path: str,
     datum_str: str,
-    kw_str: str,
+    kw_str: str | None,
     start_str: str,
     stop_str: str,
-    pause_std: float = 0.5,
+    pause_std: float | None = None,
     taetigkeiten: list[str] | None = None,
+    bundesland: str | None = None,
+    regeln: Regelwerk | None = None,
 ) -> str:
     """
     Erzeugt ein Tagesblatt im Standard v9.
     - Werte rechtsbündig in fixer Spalte (Dezimalausrichtung)
-    - Überstunden-Zeile unter Arbeitszeit (Arbeitszeit - 8,0 Std.)
+    - Überstunden-Zeile unter Arbeitszeit (Arbeitszeit - Tagessoll, Standard 8,0 Std.)
     - "Tätigkeiten:" als fette Abschnittsüberschrift
+    - regeln: Regelprofil (Tagessoll, Pausenregel); None = Standardprofil
+    - pause_std=None: Pause nach Pausenregel des Profils (Standard 0,5 Std.)
+    - kw_str leer/None: KW-Label wird aus dem Datum in datum_str abgeleitet
+    - Feiertag (laut kalender, ggf. je Bundesland): zusätzliche Zeile "Feiertag:"
     """
     taetigkeiten = taetigkeiten or []
-
-    # Zeiten berechnen
-    # Hinweis: start/stop werden als Strings erwartet; Arbeits-/Gesamtzeit werden direkt übergeben oder hier berechnet?
-    # Wir rechnen hier exemplarisch nicht aus Uhrzeiten, sondern erwarten, dass der Nutzer die tatsächlichen Zeiten
-    # durch Start/Stop vorgibt und die Pausen-Standardregel gilt (0,5 Std.), sodass Arbeitszeit = (Stop-Start)-Pause.
-    # Für exakte Berechnung aus Strings müsste man Parsing ergänzen.
-
-    arbeitszeit_h = None
-    gesamtzeit_h = None
-    # Optional: einfache Parsing-Hilfe ("HH:MM Uhr") – robust genug für 08:00 / 17:30
+    regeln = regeln or regeln_mod.regelwerk()
+    datum = kalender.parse_datum(datum_str)
+    if not kw_str and datum is not None:
+        kw_str = kalender.kw_label(datum)
+    feiertag_name = kalender.feiertag(datum, bundesland) if datum is not None else None
+
+    # Zeiten berechnen: Arbeitszeit = (Stop-Start) - Pause, Überstunden gegen Tagessoll des Profils
+    werte = None
     try:
-        def _parse(t: str):
-            t = t.replace(" Uhr", "").strip()
-            hh, mm = t.split(":")
-            return int(hh), int(mm)
-        sh, sm = _parse(start_str)
-        eh, em = _parse(stop_str)
-        gesamtzeit_h = (eh + em/60) - (sh + sm/60)
-        arbeitszeit_h = max(0.0, gesamtzeit_h - float(pause_std))
+        day = kalender.WOCHENTAGE_KURZ[datum.weekday()] if datum is not None else None
+        werte = regeln.tag(start_str, stop_str, pause_std, day)
     except Exception:
         # Fallback: keine Berechnung – in dem Fall muss der Aufrufer Texte liefern
         pass
 
-    arbeitszeit_txt = f"{arbeitszeit_h:.1f} Std." if arbeitszeit_h is not None else ""
-    gesamtzeit_txt = f"{gesamtzeit_h:.1f} Std." if gesamtzeit_h is not None else ""
-    ueberstunden_h = (arbeitszeit_h - 8.0) if arbeitszeit_h is not None else 0.0
+    arbeitszeit_txt = f"{werte.arbeitszeit:.1f} Std." if werte is not None else ""
+    gesamtzeit_txt = f"{werte.gesamtzeit:.1f} Std." if werte is not None else ""
+    ueberstunden_h = werte.ueberstunden if werte is not None else 0.0
     ueberstunden_txt = f"{ueberstunden_h:+.1f} Std."
 
     # Canvas
     c = canvas.Canvas(output_path, pagesize=A4)
-    header_y = _tb_header_footer(c, kw_str, 1)
+    header_y = _tb_header_footer(c, kw_str or "", 1)
 
     PAGE_W, PAGE_H = A4
     VALUE_X = PAGE_W - TB_MARGIN_R - 40 * mm  # feste Spalte rechtsbündig
@@ -107,6 +109,8 @@ def generate_tagesblatt(
         y -= 6 * mm
 
     row("Datum:", datum_str)
+    if feiertag_name:
+        row("Feiertag:", feiertag_name)
     row("Start:", start_str)
     row("Stopp:", stop_str)
     row("Arbeitszeit:", arbeitszeit_txt, bold=True)
@@ -153,9 +157,7 @@ W_MARGIN_R = 20 * mm
 W_MARGIN_T = 18 * mm
 W_MARGIN_B = 18 * mm
 W_BLOCK_SHIFT_X = 20 * mm
-W_WEEKLY_TARGET = 40.0  # nur Mo–Fr
 
-DAY_ORDER = ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]
 SpecialT = Literal["Urlaub", "Krank", "Feiertag", None]
 
 
@@ -176,34 +178,47 @@ def _w_header_footer(c: canvas.Canvas, week_label: str, page_num: int = 1):
 
 def generate_wochenuebersicht(
     output_path: str,
-    kw_str: str,
+    kw_str: str | None,
     # Eintrag pro Tag: (TagKurzel, StundenOderNone, Spezialtyp)
     week_data: list[tuple[str, float | None, SpecialT]],
     created_date: datetime | None = None,
+    woche: date | None = None,
+    bundesland: str | None = None,
+    regeln: Regelwerk | None = None,
 ) -> str:
     """
     Erzeugt Wochenübersicht im Standard v22 mit folgenden Regeln:
-    - Überstundenberechnung nur Mo–Fr (Basis 40,0 Std.)
+    - Überstundenberechnung nur an den Überstunden-Tagen des Profils (Standard: Mo–Fr, Basis 40,0 Std.)
     - Sa/So-Arbeit separat (nur ausgewiesen, nicht in Überstunden)
     - Urlaub/Krank/Feiertag: je 8,0 Std. Sollzeit mit Klammer-Hinweis
+    - regeln: Regelprofil (Wochensoll, Gutschriften, Zuschläge); None = Standardprofil mit obigen Werten
     - Feiertag mit Arbeit: zusätzlich unten gesammelt als "Feiertagsarbeit (XX+YY+ZZ): SUMME"
+    - Zuschlagsstunden laut Profil als eigene Zeile (nur wenn > 0)
     - Dezimalausrichtung der Zahlen (rechtsbündige Spalte)
     - Linie nach Kopf; zweite Linie zwischen So: und Gesamt:; Abschlusslinie gleich lang; Datum am Abschluss rechts
+    - woche (beliebiger Tag der KW) oder kw_str "KW NN – JJJJ": Feiertage werden automatisch
+      markiert (kalender, ggf. je Bundesland; nur an Tagen mit Soll laut Profil, i. d. R. Mo–Fr);
+      fehlt kw_str, wird es aus woche abgeleitet
     """
+    regeln = regeln or regeln_mod.regelwerk()
+    if woche is not None:
+        jahr, kw, _ = woche.isocalendar()
+        kw_str = kw_str or kalender.kw_label(woche)
+    else:
+        jahr, kw = kalender.parse_kw_label(kw_str) or (None, None)
+    if jahr is not None:
+        soll_tage = [day for day in kalender.WOCHENTAGE_KURZ if regeln.zaehlt_ueberstunden(day)]
+        week_data = kalender.woche_ergaenzen(week_data, jahr, kw, bundesland, soll_tage)
+    werte = regeln.woche(week_data)
+
     PAGE_W, PAGE_H = A4
     c = canvas.Canvas(output_path, pagesize=A4)
-    header_y = _w_header_footer(c, kw_str, 1)
+    header_y = _w_header_footer(c, kw_str or "", 1)
 
     NUM_RIGHT_X = PAGE_W - W_MARGIN_R - 60 * mm  # Spalte für Zahlen (rechtsbündig)
     LINE_END_X = PAGE_W - W_MARGIN_R - 15 * mm   # Ende zweite/Abschlusslinie + Basis-Text + Datum
 
     y = header_y - 15 * mm
-    total_weekday_hours = 0.0
-    sat_hours = 0.0
-    sun_hours = 0.0
-    total_all_hours = 0.0
-    feiertag_tage: list[str] = []
-    feiertag_sum = 0.0
 
     def draw_num(text: str, bold=True):
         c.setFont(W_FONT_BOLD if bold else W_FONT_REG, W_SIZE_TEXT)
@@ -214,51 +229,21 @@ def generate_wochenuebersicht(
         c.setFont(W_FONT_REG, W_SIZE_TEXT)
         c.drawString(W_MARGIN_L + W_BLOCK_SHIFT_X, y, f"{day}:")
 
-        if special == "Urlaub":
-            draw_num("8,0 Std.")
-            c.setFont(W_FONT_REG, W_SIZE_TEXT)
-            c.drawRightString(LINE_END_X, y, "(Urlaub)")
-            if day in DAY_ORDER[:5]:
-                total_weekday_hours += 8.0
-            total_all_hours += 8.0
-        elif special == "Krank":
-            draw_num("8,0 Std.")
-            c.setFont(W_FONT_REG, W_SIZE_TEXT)
-            c.drawRightString(LINE_END_X, y, "(Krank)")
-            if day in DAY_ORDER[:5]:
-                total_weekday_hours += 8.0
-            total_all_hours += 8.0
-        elif special == "Feiertag":
-            draw_num("8,0 Std.")
+        if special in regeln_mod.SPECIAL_TYPES:
+            # Gutschrift laut Profil; Feiertagsarbeit (hours) wird unten gesammelt ausgewiesen
+            draw_num(f"{regeln.gutschrift(day):.1f} Std.".replace(".", ",", 1))
             c.setFont(W_FONT_REG, W_SIZE_TEXT)
-            c.drawRightString(LINE_END_X, y, "(Feiertag)")
-            if day in DAY_ORDER[:5]:
-                total_weekday_hours += 8.0
-            total_all_hours += 8.0
-            # tatsächliche Arbeit an diesem Feiertag wird in hours übergeben -> unten gesammelt ausweisen
-            if hours is not None and hours > 0:
-                feiertag_tage.append(day)
-                feiertag_sum += hours
+            c.drawRightString(LINE_END_X, y, f"({special})")
         else:
             # normaler Arbeitstag oder frei
             if hours and hours > 0:
                 draw_num(f"{hours:.1f} Std.")
-                if day in DAY_ORDER[:5]:
-                    total_weekday_hours += hours
-                total_all_hours += hours
             else:
                 c.setFont(W_FONT_REG, W_SIZE_TEXT)
                 c.drawRightString(NUM_RIGHT_X, y, "–")
-        
-        if day == "Sa":
-            sat_hours = hours or 0.0
-        elif day == "So":
-            sun_hours = hours or 0.0
 
         y -= 8.0 * mm
 
-    overtime = total_weekday_hours - W_WEEKLY_TARGET
-
     # Zweite Linie zwischen So: und Gesamt:
     line_y = y + 4 * mm
     c.setLineWidth(W_LINE_THICK)
@@ -267,41 +252,58 @@ def generate_wochenuebersicht(
     # Summen
     y -= 3 * mm
     c.setFont(W_FONT_REG, W_SIZE_TEXT)
-    c.drawString(W_MARGIN_L + W_BLOCK_SHIFT_X, y, "Gesamt (Mo–Fr):")
-    draw_num(f"{total_weekday_hours:.1f} Std.")
+    c.drawString(W_MARGIN_L + W_BLOCK_SHIFT_X, y, f"Gesamt ({regeln.ueberstunden_text}):")
+    draw_num(f"{werte.weekday_hours:.1f} Std.")
 
     y -= 8.0 * mm
     c.setFont(W_FONT_REG, W_SIZE_TEXT)
-    c.drawString(W_MARGIN_L + W_BLOCK_SHIFT_X, y, "Überstunden (Mo–Fr):")
-    draw_num(f"{overtime:+.1f} Std.")
+    c.drawString(W_MARGIN_L + W_BLOCK_SHIFT_X, y, f"Überstunden ({regeln.ueberstunden_text}):")
+    draw_num(f"{werte.overtime:+.1f} Std.")
     c.setFont(W_FONT_REG, W_SIZE_TEXT)
-    c.drawRightString(LINE_END_X, y, f"(Basis {W_WEEKLY_TARGET:.1f} Std./Woche)")
+    c.drawRightString(LINE_END_X, y, f"(Basis {regeln.wochensoll:.1f} Std./Woche)")
+
+    def draw_zuschlag(art: str):
+        # Zuschlag laut Profil als Hinweis rechts (Standardprofil: keine Zuschläge)
+        satz = regeln.zuschlag(art)
+        if satz > 0:
+            c.setFont(W_FONT_REG, W_SIZE_TEXT)
+            c.drawRightString(LINE_END_X, y, f"(Zuschlag {satz * 100:.0f} %)")
 
     # Wochenendarbeit separat
-    if sat_hours > 0:
+    if werte.sat_hours > 0:
         y -= 8.0 * mm
         c.setFont(W_FONT_REG, W_SIZE_TEXT)
         c.drawString(W_MARGIN_L + W_BLOCK_SHIFT_X, y, "Samstagsarbeit:")
-        draw_num(f"{sat_hours:.1f} Std.")
-    if sun_hours > 0:
+        draw_num(f"{werte.sat_hours:.1f} Std.")
+        draw_zuschlag("Sa")
+    if werte.sun_hours > 0:
         y -= 8.0 * mm
         c.setFont(W_FONT_REG, W_SIZE_TEXT)
         c.drawString(W_MARGIN_L + W_BLOCK_SHIFT_X, y, "Sonntagsarbeit:")
-        draw_num(f"{sun_hours:.1f} Std.")
+        draw_num(f"{werte.sun_hours:.1f} Std.")
+        draw_zuschlag("So")
 
     # Feiertagsarbeit gesammelt
-    if feiertag_tage:
-        tage_str = "+".join(feiertag_tage)
+    if werte.feiertag_tage:
+        tage_str = "+".join(werte.feiertag_tage)
         y -= 8.0 * mm
         c.setFont(W_FONT_REG, W_SIZE_TEXT)
         c.drawString(W_MARGIN_L + W_BLOCK_SHIFT_X, y, f"Feiertagsarbeit ({tage_str}):")
-        draw_num(f"{feiertag_sum:.1f} Std.")
+        draw_num(f"{werte.feiertag_sum:.1f} Std.")
+        draw_zuschlag("Feiertag")
+
+    # Zuschlagsstunden (nur wenn das Profil Zuschläge vorsieht)
+    if werte.zuschlag_hours > 0:
+        y -= 8.0 * mm
+        c.setFont(W_FONT_REG, W_SIZE_TEXT)
+        c.drawString(W_MARGIN_L + W_BLOCK_SHIFT_X, y, "Zuschlagsstunden:")
+        draw_num(f"{werte.zuschlag_hours:.1f} Std.")
 
     # Gesamt (Mo–So)
     y -= 8.0 * mm
     c.setFont(W_FONT_REG, W_SIZE_TEXT)
     c.drawString(W_MARGIN_L + W_BLOCK_SHIFT_X, y, "Gesamt (Mo–So):")
-    draw_num(f"{total_all_hours:.1f} Std.")
+    draw_num(f"{werte.all_hours:.1f} Std.")
 
     # Abschlusslinie + Datum
     c.setLineWidth(W_LINE_THICK)
@@ -0,0 +1 @@
+# Stammordner der Module (flaches Layout) für pytest importierbar machen
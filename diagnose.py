@@ -0,0 +1,213 @@
+# ===============================================
+# Datei: diagnose.py
+# Speicher-Diagnose für Render-Prozesse (opt-in):
+# - tracemalloc-Schnappschuss vor/nach jedem Rendering, Top-Allokationsstellen
+# - Speicherobergrenze je Prozess (RSS) mit geordnetem Recycling
+#
+# Konfiguration (Umgebungsvariablen):
+#   ATB_DIAGNOSE=1       tracemalloc-Messung je Rendering einschalten
+#   ATB_DIAGNOSE_TOP     Anzahl gemeldeter Allokationsstellen (Standard: 10)
+#   ATB_MAX_RSS_MB       Speicherobergrenze je Prozess in MB (Standard: keine);
+#                        im Server nur unter gunicorn wirksam (Arbiter startet Worker neu)
+# ===============================================
+import os
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+from contextlib import contextmanager
+from functools import wraps
+
+TOP_N = int(os.environ.get("ATB_DIAGNOSE_TOP", 10))
+MAX_RSS_MB = float(os.environ.get("ATB_MAX_RSS_MB") or 0) or None
+RECYCLE_TIMEOUT = 60.0  # max. Wartezeit auf laufende Renderings vor dem Beenden
+SCHNAPPSCHUSS_CACHE_S = 30.0  # vollständiger Schnappschuss für den Admin-Endpunkt höchstens so oft
+MAX_TOP_N = 100
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+_lock = threading.Lock()
+_messungen: deque = deque(maxlen=100)   # letzte Messungen (Ringpuffer)
+_stellen: Counter = Counter()           # aufsummierte Netto-Allokationen je Stelle (Bytes)
+_stand = {"renderings": 0, "aktiv": 0, "recycling": False, "start_rss_mb": None}
+_schnappschuss_lock = threading.Lock()
+_schnappschuss = {"zeit": None, "n": 0, "stellen": []}
+_ohne_supervisor_gemeldet = False
+
+
+def rss_mb() -> float:
+    """Aktueller Arbeitsspeicher (RSS) des Prozesses in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE / 2**20
+    except OSError:
+        import resource  # Fallback (nicht Linux): Spitzenwert statt aktuellem Wert
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if os.uname().sysname == "Darwin" else peak / 2**10
+
+
+def aktiv() -> bool:
+    return tracemalloc.is_tracing()
+
+
+def aktivieren(frames: int = 1):
+    """tracemalloc einschalten (idempotent)."""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def ueber_limit(limit_mb: float | None = None) -> bool:
+    limit_mb = limit_mb or MAX_RSS_MB
+    return limit_mb is not None and rss_mb() > limit_mb
+
+
+def _filter(snapshot):
+    # Allokationen von tracemalloc und der Diagnose selbst ausblenden
+    return snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ))
+
+
+@contextmanager
+def messung(name: str):
+    """
+    Misst ein Rendering. Ohne aktive Diagnose nur Dauer und RSS (billig),
+    sonst zusätzlich die Netto-Allokationen je Quelltextzeile.
+    Liefert ein dict, das nach dem Block die Messwerte enthält.
+    Bei parallelen Renderings im selben Prozess enthalten die Differenzen auch deren Allokationen.
+    """
+    eintrag = {"name": name, "zeit": time.time()}
+    vorher = _filter(tracemalloc.take_snapshot()) if aktiv() else None
+    rss_vorher = rss_mb()
+    start = time.perf_counter()
+    with _lock:
+        _stand["aktiv"] += 1
+    try:
+        yield eintrag
+    finally:
+        eintrag["dauer_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        eintrag["rss_mb"] = round(rss_mb(), 1)
+        eintrag["rss_delta_mb"] = round(eintrag["rss_mb"] - rss_vorher, 2)
+        if vorher is not None:
+            diffs = _filter(tracemalloc.take_snapshot()).compare_to(vorher, "lineno")
+            eintrag["alloc_delta_kb"] = round(sum(d.size_diff for d in diffs) / 1024, 1)
+            eintrag["top"] = [
+                {"stelle": str(d.traceback[0]), "kb": round(d.size_diff / 1024, 1), "anzahl": d.count_diff}
+                for d in diffs[:TOP_N] if d.size_diff
+            ]
+        with _lock:
+            _stand["aktiv"] -= 1
+            _stand["renderings"] += 1
+            _messungen.append(eintrag)
+            for top in eintrag.get("top", ()):
+                _stellen[top["stelle"]] += int(top["kb"] * 1024)
+
+
+def top_stellen(n: int = TOP_N) -> list[dict]:
+    """
+    Aktuell belegter Speicher je Quelltextzeile (nur mit aktiver Diagnose).
+    Der Schnappschuss über den ganzen Heap ist teuer: höchstens einer gleichzeitig,
+    das Ergebnis wird SCHNAPPSCHUSS_CACHE_S Sekunden wiederverwendet.
+    """
+    if not aktiv():
+        return []
+    n = min(n, MAX_TOP_N)
+    with _schnappschuss_lock:
+        zeit = _schnappschuss["zeit"]
+        if zeit is None or time.monotonic() - zeit > SCHNAPPSCHUSS_CACHE_S or n > _schnappschuss["n"]:
+            stats = _filter(tracemalloc.take_snapshot()).statistics("lineno")
+            _schnappschuss.update(
+                zeit=time.monotonic(),
+                n=n,
+                stellen=[{"stelle": str(s.traceback[0]), "kb": round(s.size / 1024, 1), "anzahl": s.count}
+                         for s in stats[:n]],
+            )
+        return _schnappschuss["stellen"][:n]
+
+
+def bericht(n: int = TOP_N, schnappschuss: bool = False) -> dict:
+    """
+    Alle Kennzahlen für den Admin-Endpunkt. Die belegten Stellen ("top_belegt")
+    brauchen einen Heap-Schnappschuss und kommen nur mit schnappschuss=True.
+    """
+    n = min(n, MAX_TOP_N)
+    with _lock:
+        letzte = list(_messungen)[-n:]
+        wachstum = _stellen.most_common(n)
+        stand = dict(_stand)
+    traced = tracemalloc.get_traced_memory() if aktiv() else None
+    return {
+        "pid": os.getpid(),
+        "diagnose": aktiv(),
+        "rss_mb": round(rss_mb(), 1),
+        "max_rss_mb": MAX_RSS_MB,
+        **stand,
+        "tracemalloc_kb": {"aktuell": traced[0] // 1024, "spitze": traced[1] // 1024} if traced else None,
+        "top_belegt": top_stellen(n) if schnappschuss else None,
+        "top_wachstum": [{"stelle": s, "kb": round(b / 1024, 1)} for s, b in wachstum],
+        "letzte": letzte,
+    }
+
+
+# ---------------- Recycling (Server) ---------------- #
+def recycling() -> bool:
+    return _stand["recycling"]
+
+
+def _beenden():
+    # auf laufende Renderings warten, dann geordnet beenden (SIGTERM an sich selbst);
+    # der gunicorn-Arbiter startet einen frischen Worker
+    time.sleep(1.0)  # Antwort der auslösenden Anfrage noch ausliefern lassen
+    frist = time.monotonic() + RECYCLE_TIMEOUT
+    while _stand["aktiv"] > 0 and time.monotonic() < frist:
+        time.sleep(0.1)
+    os.kill(os.getpid(), signal.SIGTERM)
+
+
+def _mit_supervisor(environ) -> bool:
+    # nur unter gunicorn ersetzt der Arbiter einen beendeten Worker; mit dem
+    # Flask-Entwicklungsserver würde SIGTERM den einzigen Serverprozess beenden
+    global _ohne_supervisor_gemeldet
+    if str(environ.get("SERVER_SOFTWARE", "")).startswith("gunicorn"):
+        return True
+    if not _ohne_supervisor_gemeldet:
+        _ohne_supervisor_gemeldet = True
+        print("Warnung: Speicherobergrenze überschritten, aber kein gunicorn – Prozess wird nicht recycelt",
+              file=sys.stderr)
+    return False
+
+
+def recyceln():
+    """Nimmt keine neuen Renderings mehr an und beendet den Prozess, sobald er leer ist."""
+    with _lock:
+        if _stand["recycling"]:
+            return
+        _stand["recycling"] = True
+    threading.Thread(target=_beenden, name="atb-recycling", daemon=True).start()
+
+
+def render(f):
+    """Decorator für Flask-Render-Endpunkte: Messung + Speicherobergrenze."""
+    from flask import jsonify, request
+
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        if recycling():
+            resp = jsonify({"error": "Prozess wird neu gestartet"})
+            resp.status_code = 503
+            resp.headers["Retry-After"] = "1"
+            return resp
+        with messung(request.path):
+            result = f(*args, **kwargs)
+        if ueber_limit() and _mit_supervisor(request.environ):
+            recyceln()
+        return result
+    return wrapper
+
+
+_stand["start_rss_mb"] = round(rss_mb(), 1)
+if os.environ.get("ATB_DIAGNOSE") == "1":
+    aktivieren()
@@ -0,0 +1,26 @@
+# ===============================================
+# Datei: gunicorn.conf.py
+# Produktivbetrieb von server.py (siehe Procfile): genau ein Worker, damit
+# Ratenlimits, Parallelitätsgrenzen und Render-Slots (zugang.py) sowie die
+# Admin-Berichte für den ganzen Server gelten. Parallelität kommt aus Threads.
+#
+# Konfiguration (Umgebungsvariablen):
+#   PORT               Port (Standard: 5000)
+#   ATB_RENDER_SLOTS   gleichzeitige Renderings (Standard: CPU-Anzahl)
+#   ATB_BATCH_WARTEND  max. wartende Stapel-Anfragen (Standard: ATB_RENDER_SLOTS)
+#   ATB_THREADS        Threads des Workers (Standard: Slots + wartende Stapel-Anfragen + 4)
+# Beim Recycling (ATB_MAX_RSS_MB, diagnose.py) startet der Arbiter den Worker neu;
+# neue Verbindungen warten währenddessen in der Listen-Queue.
+# ===============================================
+import os
+
+_slots = int(os.environ.get("ATB_RENDER_SLOTS", os.cpu_count() or 4))
+_batch_wartend = int(os.environ.get("ATB_BATCH_WARTEND") or _slots)
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = 1
+worker_class = "gthread"
+# Stapel-Anfragen belegen höchstens alle Slots plus die Warteschlange; die übrigen
+# Threads bleiben für interaktive Anfragen (reservierter Slot) und leichte Endpunkte frei
+threads = int(os.environ.get("ATB_THREADS") or _slots + _batch_wartend + 4)
+graceful_timeout = 90  # > diagnose.RECYCLE_TIMEOUT
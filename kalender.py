@@ -0,0 +1,226 @@
+# ===============================================
+# Datei: kalender.py
+# Feiertage je Bundesland + ISO-Kalenderwochen (KW-Label, Wochentage)
+# Alle Berechnungen werden pro Jahr einmal ausgeführt und zwischengespeichert.
+# ===============================================
+import re
+from datetime import date, timedelta
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping
+
+BUNDESLAENDER = {
+    "BW": "Baden-Württemberg",
+    "BY": "Bayern",
+    "BE": "Berlin",
+    "BB": "Brandenburg",
+    "HB": "Bremen",
+    "HH": "Hamburg",
+    "HE": "Hessen",
+    "MV": "Mecklenburg-Vorpommern",
+    "NI": "Niedersachsen",
+    "NW": "Nordrhein-Westfalen",
+    "RP": "Rheinland-Pfalz",
+    "SL": "Saarland",
+    "SN": "Sachsen",
+    "ST": "Sachsen-Anhalt",
+    "SH": "Schleswig-Holstein",
+    "TH": "Thüringen",
+}
+
+WOCHENTAGE = ["Montag", "Dienstag", "Mittwoch", "Donnerstag", "Freitag", "Samstag", "Sonntag"]
+WOCHENTAGE_KURZ = ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]
+
+# ---------- Regeln: (Name, Länder oder None = bundesweit, ab Jahr) ----------
+# Feste Feiertage: (Monat, Tag)
+_FESTE_FEIERTAGE = [
+    ((1, 1), "Neujahr", None, None),
+    ((1, 6), "Heilige Drei Könige", {"BW", "BY", "ST"}, None),
+    ((3, 8), "Internationaler Frauentag", {"BE"}, 2019),
+    ((3, 8), "Internationaler Frauentag", {"MV"}, 2023),
+    ((5, 1), "Tag der Arbeit", None, None),
+    ((8, 15), "Mariä Himmelfahrt", {"SL"}, None),
+    ((9, 20), "Weltkindertag", {"TH"}, 2019),
+    ((10, 3), "Tag der Deutschen Einheit", None, None),
+    ((10, 31), "Reformationstag", {"BB", "MV", "SN", "ST", "TH"}, None),
+    ((10, 31), "Reformationstag", {"HB", "HH", "NI", "SH"}, 2018),
+    ((11, 1), "Allerheiligen", {"BW", "BY", "NW", "RP", "SL"}, None),
+    ((12, 25), "1. Weihnachtstag", None, None),
+    ((12, 26), "2. Weihnachtstag", None, None),
+]
+
+# Bewegliche Feiertage: Abstand in Tagen zum Ostersonntag
+_OSTER_FEIERTAGE = [
+    (-2, "Karfreitag", None),
+    (0, "Ostersonntag", {"BB"}),
+    (1, "Ostermontag", None),
+    (39, "Christi Himmelfahrt", None),
+    (49, "Pfingstsonntag", {"BB"}),
+    (50, "Pfingstmontag", None),
+    (60, "Fronleichnam", {"BW", "BY", "HE", "NW", "RP", "SL"}),
+]
+
+# Einmalige Feiertage
+_EINMALIGE_FEIERTAGE = [
+    (date(2017, 10, 31), "Reformationstag (500 Jahre)", None),
+    (date(2020, 5, 8), "Tag der Befreiung", {"BE"}),
+    (date(2025, 5, 8), "Tag der Befreiung", {"BE"}),
+]
+
+_KW_PATTERN = re.compile(r"KW\s*(\d{1,2})\s*\W*\s*(\d{4})")
+_DATUM_DE_PATTERN = re.compile(r"(\d{1,2})\.(\d{1,2})\.(\d{4})")
+_DATUM_ISO_PATTERN = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+
+
+def bundesland_pruefen(bundesland: str | None) -> str | None:
+    """Normalisiert ein Länderkürzel ("by" -> "BY"); ValueError bei unbekanntem Land."""
+    if bundesland is None:
+        return None
+    land = str(bundesland).strip().upper()
+    if land not in BUNDESLAENDER:
+        raise ValueError(f"Unbekanntes Bundesland: {bundesland!r}")
+    return land
+
+
+def _gilt(laender: set[str] | None, land: str | None) -> bool:
+    # bundesweite Feiertage gelten immer, landesspezifische nur mit passendem Land
+    return laender is None or (land is not None and land in laender)
+
+
+@lru_cache(maxsize=None)
+def ostersonntag(jahr: int) -> date:
+    """Ostersonntag nach der Gaußschen Osterformel (gregorianisch, anonymer Algorithmus)."""
+    a = jahr % 19
+    b, c = divmod(jahr, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    monat, tag = divmod(h + l - 7 * m + 114, 31)
+    return date(jahr, monat, tag + 1)
+
+
+def _buss_und_bettag(jahr: int) -> date:
+    # Mittwoch vor dem 23. November
+    d = date(jahr, 11, 22)
+    return d - timedelta(days=(d.weekday() - 2) % 7)
+
+
+@lru_cache(maxsize=None)
+def feiertage(jahr: int, bundesland: str | None = None) -> Mapping[date, str]:
+    """
+    Liefert alle gesetzlichen Feiertage eines Jahres als {Datum: Name}.
+    - bundesland=None: nur bundesweite Feiertage
+    - Ergebnis wird pro (Jahr, Land) einmal berechnet und ist schreibgeschützt
+    """
+    land = bundesland_pruefen(bundesland)
+    if land != bundesland:
+        return feiertage(jahr, land)
+
+    tage: dict[date, str] = {}
+    for (monat, tag), name, laender, ab_jahr in _FESTE_FEIERTAGE:
+        if (ab_jahr is None or jahr >= ab_jahr) and _gilt(laender, land):
+            tage[date(jahr, monat, tag)] = name
+
+    ostern = ostersonntag(jahr)
+    for offset, name, laender in _OSTER_FEIERTAGE:
+        if _gilt(laender, land):
+            tage[ostern + timedelta(days=offset)] = name
+
+    if land == "SN":
+        tage[_buss_und_bettag(jahr)] = "Buß- und Bettag"
+
+    for tag, name, laender in _EINMALIGE_FEIERTAGE:
+        if tag.year == jahr and _gilt(laender, land):
+            tage[tag] = name
+
+    return MappingProxyType(dict(sorted(tage.items())))
+
+
+def feiertag(datum: date, bundesland: str | None = None) -> str | None:
+    """Name des Feiertags an `datum` oder None."""
+    return feiertage(datum.year, bundesland).get(datum)
+
+
+@lru_cache(maxsize=4096)
+def kw_label(datum: date) -> str:
+    """ISO-Kalenderwoche als Label, z. B. "KW 38 – 2025" (Jahr = ISO-Jahr)."""
+    iso_jahr, kw, _ = datum.isocalendar()
+    return f"KW {kw} – {iso_jahr}"
+
+
+@lru_cache(maxsize=4096)
+def wochentage(jahr: int, kw: int) -> tuple[date, ...]:
+    """Alle Tage (Mo–So) der ISO-Kalenderwoche `kw` im ISO-Jahr `jahr`."""
+    montag = date.fromisocalendar(jahr, kw, 1)
+    return tuple(montag + timedelta(days=i) for i in range(7))
+
+
+@lru_cache(maxsize=None)
+def jahreswochen(jahr: int) -> tuple[tuple[int, int], ...]:
+    """Alle ISO-Wochen (ISO-Jahr, KW) eines ISO-Jahres – für Stapelverarbeitung."""
+    anzahl = date(jahr, 12, 28).isocalendar()[1]  # 28.12. liegt immer in der letzten KW
+    return tuple((jahr, kw) for kw in range(1, anzahl + 1))
+
+
+def datum_text(datum: date) -> str:
+    """Datum im Tagesblatt-Format, z. B. "Samstag, 30.08.2025"."""
+    return f"{WOCHENTAGE[datum.weekday()]}, {datum:%d.%m.%Y}"
+
+
+def parse_datum(text: str) -> date | None:
+    """Findet ein Datum (TT.MM.JJJJ oder JJJJ-MM-TT) in einem Freitext, sonst None."""
+    if not text:
+        return None
+    m = _DATUM_DE_PATTERN.search(text)
+    if m:
+        tag, monat, jahr = (int(x) for x in m.groups())
+    else:
+        m = _DATUM_ISO_PATTERN.search(text)
+        if not m:
+            return None
+        jahr, monat, tag = (int(x) for x in m.groups())
+    try:
+        return date(jahr, monat, tag)
+    except ValueError:
+        return None
+
+
+def parse_kw_label(text: str) -> tuple[int, int] | None:
+    """Liest (ISO-Jahr, KW) aus einem Label wie "KW 38 – 2025"; None ohne Treffer oder bei ungültiger KW."""
+    m = _KW_PATTERN.search(text or "")
+    if not m:
+        return None
+    jahr, kw = int(m.group(2)), int(m.group(1))
+    try:
+        date.fromisocalendar(jahr, kw, 1)
+    except ValueError:
+        return None  # z. B. "KW 53 – 2025": 2025 hat nur 52 ISO-Wochen
+    return jahr, kw
+
+
+def woche_ergaenzen(
+    week_data: list[tuple],
+    jahr: int,
+    kw: int,
+    bundesland: str | None = None,
+    soll_tage: tuple[str, ...] | list[str] = tuple(WOCHENTAGE_KURZ[:5]),
+) -> list[tuple]:
+    """
+    Setzt in week_data (TagKurzel, Stunden, Spezialtyp) automatisch "Feiertag"
+    für alle Tage der KW, die gesetzliche Feiertage sind und noch keinen Spezialtyp haben.
+    Nur Tage aus `soll_tage` (Standard Mo–Fr) werden markiert: ein Feiertag am
+    Wochenende ersetzt keine Sollzeit und bekommt daher keine Gutschrift.
+    Bereits gesetzte Spezialtypen (Urlaub/Krank/Feiertag) bleiben unverändert.
+    """
+    tage = dict(zip(WOCHENTAGE_KURZ, wochentage(jahr, kw)))
+    ergebnis = []
+    for day, hours, special in week_data:
+        tag = tage.get(day)
+        if special is None and day in soll_tage and tag is not None and feiertag(tag, bundesland):
+            special = "Feiertag"
+        ergebnis.append((day, hours, special))
+    return ergebnis
@@ -0,0 +1,355 @@
+# ===============================================
+# Datei: lasttest/lasttest.py
+# Lastgenerator für server.py (asyncio, nur Standardbibliothek):
+# gemischte POSTs auf /tagesblatt und /wochenuebersicht mit realistischen
+# Zufallsdaten, stufenweiser Steigerung der Parallelität, Latenz-/Fehlerbericht
+# und Vergleich mit gespeicherten Baselines.
+#
+# Aufruf:
+#   python lasttest/lasttest.py lasttest/szenarien/spitzenlast.json --server-starten
+#   python lasttest/lasttest.py SZENARIO --url http://localhost:5000 --speichern baseline.json
+#   python lasttest/lasttest.py SZENARIO --server-starten --vergleich baseline.json
+#   python lasttest/lasttest.py SZENARIO --server-starten --modus flask      (Entwicklungsserver)
+#   python lasttest/lasttest.py SZENARIO --server-starten --workers 2 --threads 8
+#
+# --server-starten startet den Server standardmäßig wie im Procfile (gunicorn mit
+# gunicorn.conf.py). Modus, Worker und Threads kommen aus "server" im Szenario
+# ({"modus": "gunicorn", "workers": 1, "threads": 12}) oder von der Kommandozeile.
+# ===============================================
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DAYS = ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]
+TAETIGKEITEN = [
+    "Montageübersicht Kran 1", "Montageübersicht Kran 2", "Baustellenbesprechung",
+    "Materialannahme", "Prüfung Elektrik", "Dokumentation", "Fahrt zur Baustelle",
+    "Aufmaß", "Abnahme mit Kunde", "Wartung Hebebühne",
+]
+
+
+# ---------------- Nutzlasten ---------------- #
+def _uhrzeit(stunden: float) -> str:
+    minuten = int(round(stunden * 4)) * 15  # Viertelstunden-Raster
+    return f"{minuten // 60:02d}:{minuten % 60:02d} Uhr"
+
+
+def _zufallsdatum(rng: random.Random, jahr: int) -> date:
+    return date(jahr, 1, 1) + timedelta(days=rng.randrange(365))
+
+
+def payload_tagesblatt(rng: random.Random, v: dict) -> dict:
+    start = rng.gauss(v.get("start_mittel", 7.5), v.get("start_streuung", 0.75))
+    dauer = max(1.0, rng.gauss(v.get("dauer_mittel", 8.75), v.get("dauer_streuung", 1.25)))
+    data = {
+        "datum": _zufallsdatum(rng, v.get("jahr", 2025)).isoformat(),
+        "start": _uhrzeit(start),
+        "stop": _uhrzeit(min(start + dauer, 23.75)),
+        "taetigkeiten": rng.sample(TAETIGKEITEN, rng.randint(0, v.get("taetigkeiten_max", 6))),
+    }
+    if rng.random() < v.get("anteil_pause_explizit", 0.3):
+        data["pause"] = rng.choice([0.25, 0.5, 0.75, 1.0])
+    return data
+
+
+def payload_wochenuebersicht(rng: random.Random, v: dict) -> dict:
+    week_data = []
+    for day in DAYS:
+        r = rng.random()
+        if r < v.get("anteil_urlaub", 0.05):
+            week_data.append({"day": day, "hours": None, "special": "Urlaub"})
+        elif r < v.get("anteil_urlaub", 0.05) + v.get("anteil_krank", 0.03):
+            week_data.append({"day": day, "hours": None, "special": "Krank"})
+        elif day in ("Sa", "So") and rng.random() > v.get("anteil_wochenende", 0.15):
+            week_data.append({"day": day, "hours": None, "special": None})
+        else:
+            week_data.append({"day": day, "hours": round(rng.gauss(8.5, 1.0) * 4) / 4, "special": None})
+    return {"datum": _zufallsdatum(rng, v.get("jahr", 2025)).isoformat(), "weekData": week_data}
+
+
+PAYLOADS = {
+    "tagesblatt": ("/tagesblatt", payload_tagesblatt),
+    "wochenuebersicht": ("/wochenuebersicht", payload_wochenuebersicht),
+}
+
+
+# ---------------- HTTP (minimaler Client) ---------------- #
+async def http_post(host: str, port: int, pfad: str, body: dict, headers: dict, timeout: float) -> int:
+    """POST mit JSON-Body über eine eigene Verbindung; liefert den HTTP-Status."""
+    daten = json.dumps(body).encode("utf-8")
+    kopf = [f"POST {pfad} HTTP/1.1", f"Host: {host}:{port}", "Content-Type: application/json",
+            f"Content-Length: {len(daten)}", "Connection: close"]
+    kopf += [f"{k}: {v}" for k, v in headers.items()]
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        writer.write(("\r\n".join(kopf) + "\r\n\r\n").encode("latin-1") + daten)
+        await writer.drain()
+        status_zeile = await asyncio.wait_for(reader.readline(), timeout)
+        await asyncio.wait_for(reader.read(), timeout)  # Antwort vollständig lesen
+        return int(status_zeile.split()[1])
+    finally:
+        writer.close()
+
+
+# ---------------- Ablauf ---------------- #
+class Ergebnisse:
+    def __init__(self):
+        self.messungen: list[tuple[str, int, int, float]] = []  # (name, stufe, status, latenz_ms)
+
+    def add(self, art: str, stufe: int, status: int, latenz_ms: float):
+        self.messungen.append((art, stufe, status, latenz_ms))
+
+
+async def _worker(nr: int, szenario: dict, ziel: tuple[str, int], stufe_von: list[int],
+                  ende: float, ergebnisse: Ergebnisse, seed: int):
+    rng = random.Random(seed * 1000 + nr)
+    anfragen = szenario["anfragen"]
+    gewichte = [a.get("gewicht", 1) for a in anfragen]
+    headers = {}
+    if szenario.get("api_key"):
+        headers["Authorization"] = f"Bearer {szenario['api_key']}"
+    timeout = szenario.get("timeout_s", 60)
+    pause = szenario.get("denkzeit_s", 0.0)
+
+    while time.monotonic() < ende:
+        anfrage = rng.choices(anfragen, gewichte)[0]
+        pfad, erzeuge = PAYLOADS[anfrage["art"]]
+        h = dict(headers)
+        if anfrage.get("lane"):
+            h["X-ATB-Lane"] = anfrage["lane"]
+        body = erzeuge(rng, anfrage.get("verteilung", {}))
+        stufe = stufe_von[0]  # Stufe beim Absenden (lange Anfragen nicht der nächsten Stufe zuschlagen)
+        start = time.perf_counter()
+        try:
+            status = await http_post(*ziel, pfad, body, h, timeout)
+        except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+            status = 0  # Verbindungsfehler/Timeout
+        ergebnisse.add(anfrage.get("name", anfrage["art"]), stufe, status,
+                       (time.perf_counter() - start) * 1000)
+        if pause:
+            await asyncio.sleep(rng.expovariate(1 / pause))
+
+
+async def lauf(szenario: dict, url: str, seed: int = 1) -> Ergebnisse:
+    """Führt die Stufen des Szenarios nacheinander aus (Parallelität steigt je Stufe)."""
+    teile = urlsplit(url)
+    ziel = (teile.hostname or "localhost", teile.port or 80)
+    ergebnisse = Ergebnisse()
+    stufen = szenario["stufen"]
+    ende = time.monotonic() + sum(s["dauer_s"] for s in stufen)
+    stufe_von = [0]  # aktuelle Stufe (von allen Workern gelesen)
+    tasks: list[asyncio.Task] = []
+    for i, stufe in enumerate(stufen):
+        stufe_von[0] = i
+        while len(tasks) < stufe["parallel"]:
+            tasks.append(asyncio.create_task(
+                _worker(len(tasks), szenario, ziel, stufe_von, ende, ergebnisse, seed)))
+        await asyncio.sleep(stufe["dauer_s"])
+    await asyncio.gather(*tasks)
+    return ergebnisse
+
+
+# ---------------- Auswertung ---------------- #
+def _perzentil(werte: list[float], p: float) -> float:
+    if not werte:
+        return 0.0
+    werte = sorted(werte)
+    return werte[min(len(werte) - 1, int(round(p / 100 * (len(werte) - 1))))]
+
+
+def _kennzahlen(messungen, dauer_s: float) -> dict:
+    latenzen = [m[3] for m in messungen if 200 <= m[2] < 300]
+    fehler = sum(1 for m in messungen if not 200 <= m[2] < 300)
+    return {
+        "anfragen": len(messungen),
+        "fehler": fehler,
+        "fehlerquote": round(fehler / len(messungen), 4) if messungen else 0.0,
+        "rps": round(len(messungen) / dauer_s, 2) if dauer_s else 0.0,
+        "p50_ms": round(_perzentil(latenzen, 50), 1),
+        "p90_ms": round(_perzentil(latenzen, 90), 1),
+        "p99_ms": round(_perzentil(latenzen, 99), 1),
+        "max_ms": round(max(latenzen, default=0.0), 1),
+        "status": {str(s): sum(1 for m in messungen if m[2] == s) for s in sorted({m[2] for m in messungen})},
+    }
+
+
+def auswerten(szenario: dict, ergebnisse: Ergebnisse) -> dict:
+    m = ergebnisse.messungen
+    gesamt_s = sum(s["dauer_s"] for s in szenario["stufen"])
+    return {
+        "szenario": szenario.get("name", ""),
+        "gesamt": _kennzahlen(m, gesamt_s),
+        "je_art": {a: _kennzahlen([x for x in m if x[0] == a], gesamt_s) for a in sorted({x[0] for x in m})},
+        "je_stufe": [
+            {"parallel": s["parallel"], **_kennzahlen([x for x in m if x[1] == i], s["dauer_s"])}
+            for i, s in enumerate(szenario["stufen"])
+        ],
+    }
+
+
+def _breite(namen) -> int:
+    # Namensspalte so breit wie der längste Name, plus Abstand
+    return max(map(len, namen), default=0) + 2
+
+
+def drucke(bericht: dict):
+    print(f"Szenario: {bericht['szenario']}")
+    if bericht.get("server"):
+        print("Server: " + ", ".join(f"{k}={v}" for k, v in bericht["server"].items()))
+    stufen = [f"stufe x{k['parallel']}" for k in bericht["je_stufe"]]
+    b = _breite(["gesamt", *bericht["je_art"], *stufen])
+    print(f"{'':{b}}{'Anfr.':>7}{'Fehler':>8}{'rps':>8}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}")
+
+    def zeile(name, k):
+        print(f"{name:{b}}{k['anfragen']:>7}{k['fehler']:>8}{k['rps']:>8.1f}"
+              f"{k['p50_ms']:>9.1f}{k['p90_ms']:>9.1f}{k['p99_ms']:>9.1f}{k['max_ms']:>9.1f}")
+
+    zeile("gesamt", bericht["gesamt"])
+    for art, k in bericht["je_art"].items():
+        zeile(art, k)
+    for k in bericht["je_stufe"]:
+        zeile(f"stufe x{k['parallel']}", k)
+
+
+def vergleiche(bericht: dict, baseline: dict, toleranz: float) -> bool:
+    """Vergleicht p50/p90/p99 und Fehlerquote je Art; False bei Verschlechterung über Toleranz."""
+    ok = True
+    print(f"\nVergleich mit Baseline (Toleranz {toleranz:.0%}):")
+    if bericht.get("server") != baseline.get("server"):
+        print(f"  Hinweis: Serverkonfiguration {baseline.get('server')} -> {bericht.get('server')}")
+    b = _breite(["gesamt", *bericht["je_art"]])
+    for art in ["gesamt", *bericht["je_art"]]:
+        neu = bericht["gesamt"] if art == "gesamt" else bericht["je_art"][art]
+        alt = baseline["gesamt"] if art == "gesamt" else baseline.get("je_art", {}).get(art)
+        if alt is None:
+            print(f"  {art}: keine Baseline")
+            continue
+        for key in ("p50_ms", "p90_ms", "p99_ms", "rps"):
+            delta = (neu[key] - alt[key]) / alt[key] if alt[key] else 0.0
+            schlechter = delta < -toleranz if key == "rps" else delta > toleranz
+            ok = ok and not schlechter
+            print(f"  {art:{b}}{key:12}{alt[key]:>10.1f} -> {neu[key]:>10.1f}  ({delta:+.1%})"
+                  + ("  SCHLECHTER" if schlechter else ""))
+        if neu["fehlerquote"] > alt["fehlerquote"] + 0.01:
+            ok = False
+            print(f"  {art:{b}}{'fehlerquote':12}{alt['fehlerquote']:.2%} -> {neu['fehlerquote']:.2%}  SCHLECHTER")
+    return ok
+
+
+# ---------------- Server starten ---------------- #
+def server_befehl(port: int, server: dict) -> list[str]:
+    """Startbefehl je Modus: "gunicorn" (wie Procfile) oder "flask" (python server.py)."""
+    if server.get("modus", "gunicorn") == "flask":
+        return [sys.executable, "server.py"]
+    befehl = [sys.executable, "-m", "gunicorn", "server:app", "--config", "gunicorn.conf.py",
+              "--bind", f"127.0.0.1:{port}"]
+    if server.get("workers"):
+        befehl += ["--workers", str(server["workers"])]
+    if server.get("threads"):
+        befehl += ["--threads", str(server["threads"])]
+    return befehl
+
+
+def server_starten(port: int, env: dict | None = None, server: dict | None = None) -> subprocess.Popen:
+    """Startet den Server lokal und wartet, bis "/" antwortet (PDF-Ablage über env ATB_OUTPUT_DIR)."""
+    proc = subprocess.Popen(
+        server_befehl(port, server or {}), cwd=REPO_DIR,
+        env={**os.environ, "PORT": str(port), **(env or {})},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+    async def bereit():
+        # erst bereit, wenn ein Worker antwortet (gunicorn nimmt Verbindungen schon vorher an)
+        for _ in range(100):
+            try:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                try:
+                    writer.write(f"GET / HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\nConnection: close\r\n\r\n".encode())
+                    await writer.drain()
+                    if (await asyncio.wait_for(reader.readline(), 5)).startswith(b"HTTP/"):
+                        return True
+                finally:
+                    writer.close()
+            except (OSError, asyncio.TimeoutError):
+                pass
+            if proc.poll() is not None:
+                return False
+            await asyncio.sleep(0.1)
+        return False
+
+    if not asyncio.run(bereit()):
+        proc.kill()
+        raise RuntimeError(f"Server ist nicht gestartet: {' '.join(proc.args)}")
+    return proc
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Lasttest für server.py")
+    parser.add_argument("szenario", help="Szenario-Datei (JSON), z. B. lasttest/szenarien/spitzenlast.json")
+    parser.add_argument("--url", default="http://127.0.0.1:5000", help="Basis-URL des Servers")
+    parser.add_argument("--server-starten", action="store_true", help="Server lokal starten (Port aus --url)")
+    parser.add_argument("--modus", choices=["gunicorn", "flask"],
+                        help="Serverart für --server-starten (Standard: aus Szenario, sonst gunicorn)")
+    parser.add_argument("--workers", type=int, help="gunicorn-Worker (Standard: gunicorn.conf.py)")
+    parser.add_argument("--threads", type=int, help="Threads je gunicorn-Worker (Standard: gunicorn.conf.py)")
+    parser.add_argument("--seed", type=int, default=1, help="Zufalls-Seed für reproduzierbare Nutzlasten")
+    parser.add_argument("--speichern", help="Bericht als Baseline (JSON) speichern")
+    parser.add_argument("--vergleich", help="Baseline (JSON) zum Vergleich")
+    parser.add_argument("--toleranz", type=float, default=0.2, help="erlaubte Verschlechterung (Standard: 0.2 = 20 %%)")
+    args = parser.parse_args(argv)
+
+    with open(args.szenario, encoding="utf-8") as f:
+        szenario = json.load(f)
+
+    proc = ausgabe = None
+    server = {**szenario.get("server", {}),
+              **{k: v for k, v in (("modus", args.modus), ("workers", args.workers), ("threads", args.threads))
+                 if v is not None}}
+    if args.server_starten:
+        # erzeugte PDFs in einen temporären Ordner statt nach files/ (wird danach gelöscht)
+        ausgabe = tempfile.mkdtemp(prefix="atb-lasttest-")
+        env = {**szenario.get("server_env", {}), "ATB_OUTPUT_DIR": ausgabe}
+        try:
+            proc = server_starten(urlsplit(args.url).port or 80, env, server)
+        except RuntimeError:
+            shutil.rmtree(ausgabe, ignore_errors=True)
+            raise
+    try:
+        bericht = auswerten(szenario, asyncio.run(lauf(szenario, args.url, args.seed)))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+        if ausgabe is not None:
+            shutil.rmtree(ausgabe, ignore_errors=True)
+
+    if args.server_starten:
+        # für Vergleiche zwischen Serverkonfigurationen (Worker/Threads nur bei gunicorn)
+        bericht["server"] = ({"modus": "flask"} if server.get("modus") == "flask"
+                             else {"modus": "gunicorn", **server})
+    drucke(bericht)
+    if args.speichern:
+        with open(args.speichern, "w", encoding="utf-8") as f:
+            json.dump(bericht, f, indent=2, ensure_ascii=False)
+    if args.vergleich:
+        with open(args.vergleich, encoding="utf-8") as f:
+            return 0 if vergleiche(bericht, json.load(f), args.toleranz) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
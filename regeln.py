@@ -0,0 +1,221 @@
+# ===============================================
+# Datei: regeln.py
+# Arbeitszeit-Regelprofile (Sollzeiten, Pausenregeln, Gutschriften, Zuschläge)
+# Profile werden aus JSON geladen und einmal pro Profil in ein Regelwerk kompiliert.
+# ===============================================
+import json
+import os
+from bisect import bisect_left
+from dataclasses import dataclass
+from functools import lru_cache
+
+from kalender import WOCHENTAGE_KURZ
+
+SPECIAL_TYPES = ("Urlaub", "Krank", "Feiertag")
+
+# Konfigurationsdatei (überschreibbar per Umgebungsvariable)
+REGELN_PFAD = os.environ.get(
+    "ATB_REGELN", os.path.join(os.path.dirname(os.path.abspath(__file__)), "regeln.json")
+)
+STANDARD_PROFIL = os.environ.get("ATB_PROFIL", "standard")
+
+# Eingebautes Standardprofil = bisheriges Verhalten (8,0 Std./Tag, 40,0 Std. Mo–Fr, 0,5 Std. Pause)
+_STANDARD = {
+    "tagessoll": {day: 8.0 for day in WOCHENTAGE_KURZ},
+    "ueberstunden_tage": WOCHENTAGE_KURZ[:5],
+    "gutschrift": 8.0,
+    "pausen": [[0, 0.5]],
+    "zuschlaege": {},
+}
+
+
+def tage_text(tage) -> str:
+    """Kurztext für eine Tagesauswahl: zusammenhängend "Mo–Fr", sonst "Mo+Mi+Fr"."""
+    idx = sorted(WOCHENTAGE_KURZ.index(day) for day in tage)
+    if not idx:
+        return "–"
+    if len(idx) > 2 and idx == list(range(idx[0], idx[-1] + 1)):
+        return f"{WOCHENTAGE_KURZ[idx[0]]}–{WOCHENTAGE_KURZ[idx[-1]]}"
+    return "+".join(WOCHENTAGE_KURZ[i] for i in idx)
+
+
+def parse_uhrzeit(t: str) -> float:
+    """"08:30 Uhr" / "08:30" -> 8.5 (Stunden als Dezimalzahl)."""
+    t = t.replace(" Uhr", "").strip()
+    hh, mm = t.split(":")
+    return int(hh) + int(mm) / 60
+
+
+@dataclass(frozen=True)
+class Tageswerte:
+    gesamtzeit: float
+    pause: float
+    arbeitszeit: float
+    ueberstunden: float
+
+
+@dataclass(frozen=True)
+class Wochenwerte:
+    weekday_hours: float      # Mo–Fr (bzw. Überstunden-Tage) inkl. Gutschriften
+    all_hours: float          # Mo–So inkl. Gutschriften
+    overtime: float
+    sat_hours: float
+    sun_hours: float
+    feiertag_tage: tuple[str, ...]
+    feiertag_sum: float
+    zuschlag_hours: float     # Zuschlagsstunden (Sa/So/Feiertag) laut Profil
+
+
+class Regelwerk:
+    """
+    Kompiliertes Regelprofil. Alle Nachschlagetabellen werden beim Erzeugen
+    vorberechnet; die Auswertung selbst ist zustandslos und threadsicher.
+    """
+
+    __slots__ = (
+        "name", "_tagessoll", "_ueberstunden_tage", "ueberstunden_text", "wochensoll",
+        "_gutschrift", "_pause_ab", "_pause_std", "_zuschlaege",
+    )
+
+    def __init__(self, name: str, profil: dict):
+        cfg = {**_STANDARD, **profil}
+        self.name = name
+        self._tagessoll = {day: float(cfg["tagessoll"].get(day, 0.0)) for day in WOCHENTAGE_KURZ}
+        self._ueberstunden_tage = frozenset(cfg["ueberstunden_tage"])
+        unknown = self._ueberstunden_tage - set(WOCHENTAGE_KURZ)
+        if unknown:
+            raise ValueError(f"Profil {name!r}: unbekannte Tage {sorted(unknown)}")
+        self.ueberstunden_text = tage_text(self._ueberstunden_tage)  # z. B. "Mo–Fr" für Beschriftungen
+        wochensoll = cfg.get("wochensoll")
+        if wochensoll is None:
+            wochensoll = sum(self._tagessoll[day] for day in WOCHENTAGE_KURZ if day in self._ueberstunden_tage)
+        self.wochensoll = float(wochensoll)
+        gutschrift = cfg["gutschrift"]
+        self._gutschrift = {
+            day: float(gutschrift) if gutschrift is not None else self._tagessoll[day]
+            for day in WOCHENTAGE_KURZ
+        }
+        # Pausenregeln: [[ab Gesamtzeit (Std., exklusiv), Pause (Std.)], ...]
+        pausen = sorted((float(ab), float(p)) for ab, p in cfg["pausen"])
+        self._pause_ab = tuple(ab for ab, _ in pausen)
+        self._pause_std = tuple(p for _, p in pausen)
+        self._zuschlaege = {k: float(v) for k, v in cfg["zuschlaege"].items()}
+
+    def __repr__(self):
+        return f"Regelwerk({self.name!r}, wochensoll={self.wochensoll})"
+
+    # ---------- Einzelregeln ----------
+    def tagessoll(self, day: str | None = None) -> float:
+        """Sollzeit eines Tages; ohne Tag die Sollzeit Mo (Standard-Arbeitstag)."""
+        return self._tagessoll.get(day or "Mo", 0.0)
+
+    def gutschrift(self, day: str) -> float:
+        """Gutgeschriebene Stunden für Urlaub/Krank/Feiertag an `day`."""
+        return self._gutschrift.get(day, 0.0)
+
+    def pause(self, gesamtzeit: float) -> float:
+        """Pflichtpause für eine Schicht der Länge `gesamtzeit` (Std.)."""
+        i = bisect_left(self._pause_ab, gesamtzeit) - 1
+        return self._pause_std[i] if i >= 0 else 0.0
+
+    def zuschlag(self, art: str) -> float:
+        """Zuschlagssatz (z. B. 0.25 = 25 %) für "Sa", "So" oder "Feiertag"."""
+        return self._zuschlaege.get(art, 0.0)
+
+    def zaehlt_ueberstunden(self, day: str) -> bool:
+        return day in self._ueberstunden_tage
+
+    # ---------- Auswertung ----------
+    def tag(
+        self,
+        start_str: str,
+        stop_str: str,
+        pause_std: float | None = None,
+        day: str | None = None,
+    ) -> Tageswerte:
+        """Gesamt-/Arbeitszeit und Überstunden eines Tages; pause_std=None -> Pausenregel."""
+        gesamtzeit = parse_uhrzeit(stop_str) - parse_uhrzeit(start_str)
+        pause = self.pause(gesamtzeit) if pause_std is None else float(pause_std)
+        arbeitszeit = max(0.0, gesamtzeit - pause)
+        return Tageswerte(gesamtzeit, pause, arbeitszeit, arbeitszeit - self.tagessoll(day))
+
+    def woche(self, week_data) -> Wochenwerte:
+        """Summen einer Woche aus (TagKurzel, StundenOderNone, Spezialtyp)-Einträgen."""
+        weekday_hours = 0.0
+        all_hours = 0.0
+        sat_hours = 0.0
+        sun_hours = 0.0
+        feiertag_tage: list[str] = []
+        feiertag_sum = 0.0
+
+        for day, hours, special in week_data:
+            if special in SPECIAL_TYPES:
+                value = self.gutschrift(day)
+                # tatsächliche Arbeit an einem Feiertag wird separat gesammelt
+                if special == "Feiertag" and hours is not None and hours > 0:
+                    feiertag_tage.append(day)
+                    feiertag_sum += hours
+            else:
+                value = hours if hours and hours > 0 else 0.0
+            if self.zaehlt_ueberstunden(day):
+                weekday_hours += value
+            all_hours += value
+
+            if day == "Sa":
+                sat_hours = hours or 0.0
+            elif day == "So":
+                sun_hours = hours or 0.0
+
+        zuschlag_hours = (
+            sat_hours * self.zuschlag("Sa")
+            + sun_hours * self.zuschlag("So")
+            + feiertag_sum * self.zuschlag("Feiertag")
+        )
+        return Wochenwerte(
+            weekday_hours=weekday_hours,
+            all_hours=all_hours,
+            overtime=weekday_hours - self.wochensoll,
+            sat_hours=sat_hours,
+            sun_hours=sun_hours,
+            feiertag_tage=tuple(feiertag_tage),
+            feiertag_sum=feiertag_sum,
+            zuschlag_hours=zuschlag_hours,
+        )
+
+
+# ---------- Laden ----------
+@lru_cache(maxsize=None)
+def _lade_profile(pfad: str, mtime: float) -> dict:
+    with open(pfad, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def profile(pfad: str | None = None) -> dict:
+    """Alle Profile aus der Konfigurationsdatei (ohne Datei: nur "standard")."""
+    pfad = pfad or REGELN_PFAD
+    try:
+        mtime = os.path.getmtime(pfad)
+    except OSError:
+        return {"standard": _STANDARD}
+    return {"standard": _STANDARD, **_lade_profile(pfad, mtime)}
+
+
+@lru_cache(maxsize=None)
+def _kompiliere(name: str, pfad: str, mtime: float) -> Regelwerk:
+    alle = profile(pfad)
+    if name not in alle:
+        raise ValueError(f"Unbekanntes Regelprofil: {name!r}")
+    return Regelwerk(name, alle[name])
+
+
+def regelwerk(name: str | None = None, pfad: str | None = None) -> Regelwerk:
+    """
+    Kompiliertes Regelwerk für ein Profil. Jedes Profil wird pro Prozess genau
+    einmal kompiliert (bzw. erneut, wenn sich die Konfigurationsdatei ändert).
+    """
+    pfad = pfad or REGELN_PFAD
+    try:
+        mtime = os.path.getmtime(pfad)
+    except OSError:
+        mtime = 0.0
+    return _kompiliere(name or STANDARD_PROFIL, pfad, mtime)
@@ -1,43 +1,154 @@
 import os
-from flask import Flask, request, jsonify
+import uuid
+from datetime import date
+from flask import Flask, request, jsonify, send_from_directory
+from werkzeug.middleware.proxy_fix import ProxyFix
 from arbeitstagebuch_standard_python_skripte_tagesblatt_wochenubersicht import (
     generate_tagesblatt,
     generate_wochenuebersicht
 )
+import kalender
+import diagnose
+import regeln
+import zugang
 
 # Flask App
 app = Flask(__name__)
 
+# Anzahl vertrauenswürdiger Proxys vor der App (z. B. 1 beim Hosting hinter einem
+# Load Balancer): X-Forwarded-For/-Proto werden dann für remote_addr/Schema übernommen,
+# damit Ratenlimits je Client-IP greifen. 0 = direkt erreichbar, Header ignorieren.
+PROXY_HOPS = int(os.environ.get("ATB_PROXY_HOPS", 0))
+if PROXY_HOPS > 0:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=PROXY_HOPS, x_proto=PROXY_HOPS)
+
+# Speicherordner für PDFs
+OUTPUT_DIR = os.environ.get("ATB_OUTPUT_DIR") or "files"
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+# Standard-Bundesland für Feiertage (z. B. "BY"); leer = nur bundesweite Feiertage
+BUNDESLAND = os.environ.get("ATB_BUNDESLAND") or None
+
+
+def _output_path(prefix: str) -> str:
+    file_id = str(uuid.uuid4()).replace("-", "")[:8]
+    return os.path.join(OUTPUT_DIR, f"{prefix}_{file_id}.pdf")
+
+
+def _datum(data: dict) -> date | None:
+    """ISO-Datum ("2025-09-15") aus dem Request, falls vorhanden; ValueError bei anderem Format."""
+    value = data.get("datum")
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Ungültiges Datum {value!r} (erwartet JJJJ-MM-TT)") from None
+
+
+def _bundesland(data: dict) -> str | None:
+    return kalender.bundesland_pruefen(data.get("bundesland", BUNDESLAND))
+
+
+def _regelwerk(data: dict) -> regeln.Regelwerk:
+    """Regelprofil aus dem Request ("profil"); ValueError bei unbekanntem Profil."""
+    return regeln.regelwerk(data.get("profil"))
+
+
 # ---------------- API Endpunkte ---------------- #
 @app.route("/tagesblatt", methods=["POST"])
+@zugang.render
+@diagnose.render
 def tagesblatt():
     data = request.json
+    try:
+        datum = _datum(data)
+        bundesland = _bundesland(data)
+        regelwerk = _regelwerk(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     try:
         pdf_path = generate_tagesblatt(
-            datum=data.get("datum"),
-            start=data.get("start"),
-            stop=data.get("stop"),
-            pause=data.get("pause", 0.5),
-            taetigkeiten=data.get("taetigkeiten", [])
+            output_path=_output_path("tagesblatt"),
+            datum_str=kalender.datum_text(datum) if datum else data.get("datumText", ""),
+            kw_str=data.get("kwLabel"),
+            start_str=data.get("start"),
+            stop_str=data.get("stop"),
+            pause_std=data.get("pause"),
+            taetigkeiten=data.get("taetigkeiten", []),
+            bundesland=bundesland,
+            regeln=regelwerk,
         )
-        return jsonify({"url": f"/{pdf_path}", "local_path": pdf_path})
+        return jsonify({"url": f"/files/{os.path.basename(pdf_path)}", "local_path": pdf_path})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @app.route("/wochenuebersicht", methods=["POST"])
+@zugang.render
+@diagnose.render
 def wochenuebersicht():
     data = request.json
     try:
+        woche = _datum(data)
+        bundesland = _bundesland(data)
+        regelwerk = _regelwerk(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        week_data = [
+            (item["day"], item.get("hours"), item.get("special"))
+            for item in data.get("weekData", [])
+        ]
         pdf_path = generate_wochenuebersicht(
-            kwLabel=data.get("kwLabel"),
-            weekData=data.get("weekData", [])
+            output_path=_output_path("woche"),
+            kw_str=data.get("kwLabel"),
+            week_data=week_data,
+            woche=woche,
+            bundesland=bundesland,
+            regeln=regelwerk,
         )
-        return jsonify({"url": f"/{pdf_path}", "local_path": pdf_path})
+        return jsonify({"url": f"/files/{os.path.basename(pdf_path)}", "local_path": pdf_path})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/feiertage/<int:jahr>")
+def feiertage(jahr):
+    bundesland = request.args.get("bundesland", BUNDESLAND)
+    try:
+        tage = kalender.feiertage(jahr, bundesland)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({tag.isoformat(): name for tag, name in tage.items()})
+
+
+@app.route("/profile")
+def profile():
+    return jsonify(sorted(regeln.profile()))
+
+
+@app.route("/admin/zugang")
+@zugang.admin
+def admin_zugang():
+    return jsonify(zugang.status())
+
+
+@app.route("/admin/diagnose")
+@zugang.admin
+def admin_diagnose():
+    # ?schnappschuss=1: zusätzlich belegter Speicher je Stelle (teuer, gecacht)
+    return jsonify(diagnose.bericht(
+        request.args.get("top", diagnose.TOP_N, type=int),
+        schnappschuss=request.args.get("schnappschuss", 0, type=int) == 1,
+    ))
+
+
+@app.route("/files/<path:filename>")
+def get_file(filename):
+    return send_from_directory(OUTPUT_DIR, filename)
+
+
 @app.route("/")
 def root():
     return "Arbeitstagebuch API läuft 🚀"
@@ -45,5 +156,8 @@ def root():
 
 # ---------------- Start ---------------- #
 if __name__ == "__main__":
+    if diagnose.MAX_RSS_MB:
+        # Recycling braucht einen Supervisor, der beendete Worker ersetzt (siehe Procfile)
+        raise SystemExit("ATB_MAX_RSS_MB wird nur unter gunicorn unterstützt: gunicorn server:app --config gunicorn.conf.py")
     port = int(os.environ.get("PORT", 5000))
     app.run(host="0.0.0.0", port=port)
@@ -0,0 +1,510 @@
+# ===============================================
+# Datei: stapel.py
+# Kommandozeilen-Stapelgenerator: liest Zeiteinträge (CSV/JSONL) als Stream,
+# gruppiert nach Tag und ISO-Woche und erzeugt Tagesblätter + Wochenübersichten
+# parallel (Prozess-Pool). Dokumente, deren Eingaben sich seit dem letzten
+# Lauf nicht geändert haben, werden übersprungen (Manifest, siehe abgleich.py).
+# Dokumente aus den Wochen der Eingabe, die sie nicht mehr erzeugt, werden als
+# veraltet gemeldet und mit --aufraeumen entfernt (ohne alles neu zu erzeugen).
+#
+# Aufruf:
+#   python stapel.py eintraege.csv -o ausgabe --jobs 4 --bundesland BY
+#
+# Eingabefelder je Zeile (CSV-Kopfzeile bzw. JSON-Schlüssel):
+#   datum (JJJJ-MM-TT oder TT.MM.JJJJ), start, stop, pause (optional),
+#   taetigkeiten (JSONL: Liste; CSV: durch "|" getrennt), special (Urlaub/Krank/Feiertag),
+#   hours (optional: Stunden an Spezialtagen, z. B. Feiertagsarbeit)
+# Alle Einträge einer ISO-Woche müssen zusammenhängend in der Eingabe stehen
+# (z. B. nach Datum sortiert); innerhalb der Woche ist die Reihenfolge beliebig.
+# Fehlerhafte Zeilen werden mit Zeilennummer gemeldet und übersprungen.
+# ===============================================
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from datetime import date
+from collections import Counter
+from itertools import groupby
+
+from arbeitstagebuch_standard_python_skripte_tagesblatt_wochenubersicht import (
+    generate_tagesblatt,
+    generate_wochenuebersicht,
+)
+import abgleich
+import diagnose
+import kalender
+import regeln
+
+
+# ---------------- Einlesen (Streaming) ---------------- #
+def _lies_csv(f):
+    reader = csv.DictReader(f)
+    for row in reader:
+        tasks = row.get("taetigkeiten") or ""
+        row["taetigkeiten"] = [t.strip() for t in tasks.split("|") if t.strip()]
+        yield reader.line_num, row
+
+
+def _lies_jsonl(f):
+    for nr, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError("kein JSON-Objekt")
+        except ValueError as e:
+            yield nr, ValueError(f"ungültiges JSON ({e})")
+            continue
+        tasks = row.get("taetigkeiten") or []
+        row["taetigkeiten"] = [tasks] if isinstance(tasks, str) else list(tasks)
+        yield nr, row
+
+
+def _float_oder_none(value):
+    return None if value in (None, "") else float(value)
+
+
+def _pruefen(row: dict) -> dict:
+    """Prüft und normalisiert einen Eintrag; ValueError mit Klartext bei ungültigen Feldern."""
+    datum = kalender.parse_datum(str(row.get("datum") or ""))
+    if datum is None:
+        raise ValueError(f"kein gültiges Datum ({row.get('datum')!r})")
+    row["datum"] = datum
+
+    start, stop = row.get("start") or None, row.get("stop") or None
+    if (start is None) != (stop is None):
+        raise ValueError("start und stop nur gemeinsam angeben")
+    if start is not None:
+        zeiten = []
+        for feld, wert in (("start", start), ("stop", stop)):
+            try:
+                h = regeln.parse_uhrzeit(str(wert))
+            except ValueError:
+                raise ValueError(f"{feld}: ungültige Uhrzeit {wert!r} (erwartet HH:MM)") from None
+            if not 0 <= h <= 24:
+                raise ValueError(f"{feld}: Uhrzeit außerhalb 00:00–24:00 ({wert!r})")
+            zeiten.append(h)
+        if zeiten[1] <= zeiten[0]:
+            raise ValueError(f"stop ({stop}) liegt nicht nach start ({start})")
+    row["start"], row["stop"] = start, stop
+
+    for feld in ("pause", "hours"):
+        try:
+            wert = _float_oder_none(row.get(feld))
+        except (TypeError, ValueError):
+            raise ValueError(f"{feld}: keine Zahl ({row.get(feld)!r})") from None
+        if wert is not None and wert < 0:
+            raise ValueError(f"{feld}: negativ ({wert})")
+        row[feld] = wert
+
+    special = row.get("special") or None
+    if special is not None and special not in regeln.SPECIAL_TYPES:
+        raise ValueError(f"special: unbekannt ({special!r}, erlaubt: {', '.join(regeln.SPECIAL_TYPES)})")
+    row["special"] = special
+    return row
+
+
+def lies_eintraege(pfad: str, format: str | None = None, fehler=None):
+    """
+    Liefert geprüfte Einträge zeilenweise (die Datei wird nie komplett geladen).
+    fehler(nr, meldung): wird für ungültige Zeilen aufgerufen, die Zeile übersprungen;
+    ohne Callback bricht die erste ungültige Zeile mit ValueError ab.
+    """
+    format = format or ("jsonl" if pfad.endswith((".jsonl", ".ndjson")) else "csv")
+    reader = _lies_jsonl if format == "jsonl" else _lies_csv
+    with (sys.stdin if pfad == "-" else open(pfad, encoding="utf-8", newline="")) as f:
+        for nr, row in reader(f):
+            try:
+                if isinstance(row, Exception):
+                    raise row
+                yield _pruefen(row)
+            except ValueError as e:
+                if fehler is None:
+                    raise ValueError(f"Zeile {nr}: {e}") from None
+                fehler(nr, str(e))
+
+
+def _tag(datum: date, zeilen: list[dict]) -> dict:
+    """
+    Fasst alle Einträge eines Datums zu einem Tag zusammen: frühester Start,
+    spätester Stopp, Tätigkeiten aneinandergehängt. Lücken zwischen den
+    Zeitblöcken zählen nicht als Arbeitszeit ("luecken", Std.).
+    """
+    tag = {"datum": datum, "start": None, "stop": None, "pause": None, "luecken": 0.0,
+           "taetigkeiten": [], "special": None, "hours": None}
+    bloecke = []
+    for row in zeilen:
+        if row["start"]:
+            bloecke.append((regeln.parse_uhrzeit(row["start"]), regeln.parse_uhrzeit(row["stop"]),
+                            row["start"], row["stop"]))
+        if row["pause"] is not None:
+            tag["pause"] = (tag["pause"] or 0.0) + row["pause"]
+        if row["hours"] is not None:
+            tag["hours"] = (tag["hours"] or 0.0) + row["hours"]
+        tag["special"] = row["special"] or tag["special"]
+        tag["taetigkeiten"].extend(row["taetigkeiten"])
+
+    if bloecke:
+        bloecke.sort()
+        tag["start"] = bloecke[0][2]
+        tag["stop"] = max(bloecke, key=lambda b: b[1])[3]
+        # Lücken = Zeit zwischen den (zusammengeführten) Blöcken
+        ende = bloecke[0][1]
+        for von, bis, _, _ in bloecke[1:]:
+            if von > ende:
+                tag["luecken"] += von - ende
+            ende = max(ende, bis)
+    return tag
+
+
+def wochen(eintraege):
+    """
+    Gruppiert Einträge nach ISO-Woche -> ((ISO-Jahr, KW), [Tage nach Datum]).
+    Einträge desselben Datums werden innerhalb der Woche unabhängig von ihrer
+    Reihenfolge zusammengefasst.
+    """
+    gesehen: set[tuple[int, int]] = set()
+    for key, gruppe in groupby(eintraege, key=lambda row: row["datum"].isocalendar()[:2]):
+        if key in gesehen:
+            raise ValueError(f"Eingabe nicht wochenweise zusammenhängend: KW {key[1]}/{key[0]} mehrfach")
+        gesehen.add(key)
+        nach_datum: dict[date, list[dict]] = {}
+        for row in gruppe:
+            nach_datum.setdefault(row["datum"], []).append(row)
+        yield key, [_tag(datum, zeilen) for datum, zeilen in sorted(nach_datum.items())]
+
+
+# ---------------- Aufträge ---------------- #
+def auftraege(eintraege, ausgabe: str, profil: str | None, bundesland: str | None):
+    """Erzeugt Render-Aufträge (art, pfad, kwargs) je Tag und je Woche."""
+    regelwerk = regeln.regelwerk(profil)
+    for (jahr, kw), wochentage in wochen(eintraege):
+        stunden = {}
+        for tag in wochentage:
+            datum: date = tag["datum"]
+            day = kalender.WOCHENTAGE_KURZ[datum.weekday()]
+            hours = tag["hours"]
+            if tag["start"] and tag["stop"]:
+                pause = tag["pause"]
+                if tag["luecken"]:
+                    # Lücken zwischen Zeitblöcken sind Pause: zusätzlich zur angegebenen Pause,
+                    # ohne Angabe mindestens die Pflichtpause laut Profil
+                    gesamt = regeln.parse_uhrzeit(tag["stop"]) - regeln.parse_uhrzeit(tag["start"])
+                    pause = (tag["luecken"] + pause if pause is not None
+                             else max(tag["luecken"], regelwerk.pause(gesamt)))
+                werte = regelwerk.tag(tag["start"], tag["stop"], pause, day)
+                hours = werte.arbeitszeit if hours is None else hours
+                yield ("tagesblatt", os.path.join(ausgabe, "tagesblatt", f"{datum.isoformat()}.pdf"), {
+                    "datum_str": kalender.datum_text(datum),
+                    "kw_str": kalender.kw_label(datum),
+                    "start_str": tag["start"],
+                    "stop_str": tag["stop"],
+                    "pause_std": pause,
+                    "taetigkeiten": tag["taetigkeiten"],
+                    "bundesland": bundesland,
+                })
+            stunden[day] = (day, hours, tag["special"])
+
+        week_data = [stunden.get(day, (day, None, None)) for day in kalender.WOCHENTAGE_KURZ]
+        yield ("woche", os.path.join(ausgabe, "woche", f"{jahr}-W{kw:02d}.pdf"), {
+            "kw_str": f"KW {kw} – {jahr}",
+            "week_data": week_data,
+            "woche": date.fromisocalendar(jahr, kw, 1),
+            "bundesland": bundesland,
+        })
+
+
+_WOCHE_DATEI = re.compile(r"(\d{4})-W(\d{2})\.pdf$")
+
+
+def _woche_von(pfad: str) -> tuple[int, int] | None:
+    """ISO-Woche eines Dokuments aus seinem Pfad (tagesblatt/JJJJ-MM-TT.pdf, woche/JJJJ-Www.pdf)."""
+    ordner, name = os.path.split(pfad)
+    ordner = os.path.basename(ordner)
+    try:
+        if ordner == "tagesblatt" and name.endswith(".pdf"):
+            return date.fromisoformat(name[:-4]).isocalendar()[:2]
+        m = _WOCHE_DATEI.fullmatch(name)
+        if ordner == "woche" and m:
+            return int(m.group(1)), int(m.group(2))
+    except ValueError:
+        pass
+    return None
+
+
+class Abdeckung:
+    """
+    Merkt sich, welche Dokumente die Eingabe erzeugt und welche ISO-Wochen sie
+    abdeckt. Dokumente aus diesen Wochen, die die Eingabe nicht mehr erzeugt
+    (z. B. Tag entfernt oder auf ein anderes Datum verschoben), sind veraltet.
+    """
+
+    def __init__(self):
+        self.pfade: set[str] = set()
+        self.wochen: set[tuple[int, int]] = set()
+
+    def erfassen(self, auftraege_iter):
+        for art, pfad, kwargs in auftraege_iter:
+            self.pfade.add(os.path.normpath(pfad))
+            if art == "woche":
+                self.wochen.add(kwargs["woche"].isocalendar()[:2])
+            yield art, pfad, kwargs
+
+    def veraltet(self, ausgabe: str, manifest: abgleich.Manifest | None = None) -> list[str]:
+        """Veraltete Dokumente laut Manifest und im Ausgabeordner (erst nach dem Lauf aufrufen)."""
+        kandidaten = {os.path.normpath(p) for p in manifest.pfade()} if manifest is not None else set()
+        for ordner in ("tagesblatt", "woche"):
+            try:
+                namen = os.listdir(os.path.join(ausgabe, ordner))
+            except FileNotFoundError:
+                continue
+            kandidaten.update(os.path.normpath(os.path.join(ausgabe, ordner, n)) for n in namen if n.endswith(".pdf"))
+        return sorted(p for p in kandidaten if p not in self.pfade and _woche_von(p) in self.wochen)
+
+
+def render(art: str, pfad: str, kwargs: dict, profil: str | None = None,
+           max_rss_mb: float | None = None) -> dict:
+    """
+    Erzeugt ein Dokument atomar (temporäre Datei + Umbenennen).
+    Liefert die Messwerte (diagnose.messung) inkl. "ueber_limit" für die Speicherobergrenze.
+    """
+    os.makedirs(os.path.dirname(pfad), exist_ok=True)
+    tmp = f"{pfad}.{os.getpid()}.tmp"
+    generate = generate_tagesblatt if art == "tagesblatt" else generate_wochenuebersicht
+    try:
+        with diagnose.messung(pfad) as eintrag:
+            generate(tmp, regeln=regeln.regelwerk(profil), **kwargs)
+        os.replace(tmp, pfad)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    eintrag["ueber_limit"] = diagnose.ueber_limit(max_rss_mb)
+    return eintrag
+
+
+def _vorhanden(pfad: str) -> bool:
+    try:
+        return os.path.getsize(pfad) > 0
+    except OSError:
+        return False
+
+
+# ---------------- Ausführung ---------------- #
+class Fortschritt:
+    def __init__(self, intervall: float = 2.0, stream=None):
+        self.intervall = intervall
+        self.stream = stream or sys.stderr  # erst zur Laufzeit auflösen (umgeleitetes stderr)
+        self.erstellt = 0
+        self.uebersprungen = 0
+        self.fehler = 0
+        self.recycelt = 0
+        self.stellen: Counter = Counter()  # Netto-Allokationen je Quelltextzeile (nur --diagnose)
+        self._start = time.monotonic()
+        self._letzte = self._start
+
+    def melde(self, ende: bool = False):
+        jetzt = time.monotonic()
+        if not ende and jetzt - self._letzte < self.intervall:
+            return
+        self._letzte = jetzt
+        dauer = jetzt - self._start
+        rate = self.erstellt / dauer if dauer > 0 else 0.0
+        print(
+            f"{self.erstellt} erstellt, {self.uebersprungen} übersprungen, "
+            f"{self.fehler} Fehler ({rate:.1f}/s, {dauer:.0f} s)"
+            + (f", {self.recycelt} Prozess-Neustarts" if self.recycelt else ""),
+            file=self.stream,
+        )
+
+    def melde_stellen(self, n: int = diagnose.TOP_N):
+        if not self.stellen:
+            return
+        print("Top-Allokationsstellen (Netto-Zuwachs über alle Renderings):", file=self.stream)
+        for stelle, groesse in self.stellen.most_common(n):
+            print(f"  {groesse / 1024:10.1f} KB  {stelle}", file=self.stream)
+
+
+def lauf(auftraege_iter, jobs: int = 1, force: bool = False, profil: str | None = None,
+         fortschritt: Fortschritt | None = None,
+         manifest: abgleich.Manifest | None = None,
+         max_rss_mb: float | None = None, diagnose_an: bool = False) -> Fortschritt:
+    """
+    Arbeitet alle Aufträge ab; höchstens jobs*4 Aufträge gleichzeitig in Arbeit.
+    Mit Manifest werden nur Dokumente mit geänderten Eingaben erzeugt,
+    ohne Manifest alle noch nicht vorhandenen.
+    max_rss_mb: überschreitet ein Worker die Grenze, wird der Pool geordnet
+    geleert und durch frische Prozesse ersetzt.
+    diagnose_an: tracemalloc in den Workern, Top-Allokationsstellen am Ende.
+    """
+    fortschritt = fortschritt or Fortschritt()
+
+    def offen():
+        for art, pfad, kwargs in auftraege_iter:
+            fp = abgleich.fingerabdruck(art, kwargs, profil) if manifest is not None else None
+            if not force and (manifest.aktuell(pfad, fp) if manifest is not None else _vorhanden(pfad)):
+                fortschritt.uebersprungen += 1
+                fortschritt.melde()
+                continue
+            yield art, pfad, kwargs, fp
+
+    recyceln = False
+
+    def fertig(pfad, fp, e=None, eintrag=None):
+        nonlocal recyceln
+        if e is not None:
+            fortschritt.fehler += 1
+            print(f"Fehler bei {pfad}: {e}", file=sys.stderr)
+        else:
+            fortschritt.erstellt += 1
+            if manifest is not None:
+                manifest.setzen(pfad, fp)
+            for top in eintrag.get("top", ()):
+                fortschritt.stellen[top["stelle"]] += int(top["kb"] * 1024)
+            recyceln = recyceln or eintrag["ueber_limit"]
+        fortschritt.melde()
+
+    def neuer_pool():
+        return ProcessPoolExecutor(max_workers=jobs, initializer=diagnose.aktivieren if diagnose_an else None)
+
+    try:
+        if jobs <= 1 and max_rss_mb is None:
+            if diagnose_an:
+                diagnose.aktivieren()
+            for art, pfad, kwargs, fp in offen():
+                try:
+                    eintrag = render(art, pfad, kwargs, profil)
+                except Exception as e:
+                    fertig(pfad, fp, e)
+                else:
+                    fertig(pfad, fp, eintrag=eintrag)
+        else:
+            jobs = max(1, jobs)
+            pool = neuer_pool()
+            laufend = {}
+            try:
+                for art, pfad, kwargs, fp in offen():
+                    if recyceln:
+                        # Speicherobergrenze erreicht: laufende Aufträge abwarten, Prozesse ersetzen
+                        for future in as_completed(list(laufend)):
+                            _abschliessen(future, *laufend.pop(future), fertig)
+                        pool.shutdown(wait=True)
+                        pool = neuer_pool()
+                        recyceln = False
+                        fortschritt.recycelt += 1
+                    laufend[pool.submit(render, art, pfad, kwargs, profil, max_rss_mb)] = (pfad, fp)
+                    if len(laufend) >= jobs * 4:
+                        erledigt, _ = wait(laufend, return_when=FIRST_COMPLETED)
+                        for future in erledigt:
+                            _abschliessen(future, *laufend.pop(future), fertig)
+                for future in as_completed(list(laufend)):
+                    _abschliessen(future, *laufend.pop(future), fertig)
+            finally:
+                pool.shutdown(wait=True)
+    finally:
+        if manifest is not None:
+            manifest.speichern()
+    fortschritt.melde(ende=True)
+    fortschritt.melde_stellen()
+    return fortschritt
+
+
+def _abschliessen(future, pfad, fp, fertig):
+    try:
+        eintrag = future.result()
+    except Exception as e:
+        fertig(pfad, fp, e)
+    else:
+        fertig(pfad, fp, eintrag=eintrag)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Tagesblätter und Wochenübersichten im Stapel erzeugen.")
+    parser.add_argument("eingabe", help="CSV- oder JSONL-Datei mit Zeiteinträgen ('-' = stdin)")
+    parser.add_argument("-o", "--ausgabe", default="files", help="Ausgabeordner (Standard: files)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Eingabeformat (Standard: nach Dateiendung)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="Anzahl paralleler Prozesse")
+    parser.add_argument("--profil", default=None, help="Regelprofil aus regeln.json")
+    parser.add_argument("--bundesland", default=os.environ.get("ATB_BUNDESLAND") or None,
+                        help="Bundesland für Feiertage, z. B. BY")
+    parser.add_argument("--force", action="store_true", help="alle Dokumente neu erzeugen")
+    parser.add_argument("--aufraeumen", action="store_true",
+                        help="veraltete Dokumente (Wochen der Eingabe, nicht mehr erzeugt) löschen")
+    parser.add_argument("--max-rss-mb", type=float, default=diagnose.MAX_RSS_MB,
+                        help="Speicherobergrenze je Worker-Prozess; bei Überschreitung werden die Worker ersetzt")
+    parser.add_argument("--diagnose", action="store_true", default=diagnose.aktiv(),
+                        help="tracemalloc-Messung je Dokument, Top-Allokationsstellen am Ende")
+    parser.add_argument("--plan", action="store_true",
+                        help="nur auflisten, welche Dokumente sich geändert haben (nichts erzeugen)")
+    nur = parser.add_mutually_exclusive_group()
+    nur.add_argument("--nur-tagesblatt", action="store_true", help="keine Wochenübersichten")
+    nur.add_argument("--nur-woche", action="store_true", help="keine Tagesblätter")
+    args = parser.parse_args(argv)
+
+    try:
+        # unbekanntes Profil/Bundesland früh melden statt bei jedem Dokument
+        regeln.regelwerk(args.profil)
+        args.bundesland = kalender.bundesland_pruefen(args.bundesland)
+    except ValueError as e:
+        parser.error(str(e))
+    fortschritt = Fortschritt()
+    eingabefehler = 0
+
+    def zeilenfehler(nr, meldung):
+        nonlocal eingabefehler
+        eingabefehler += 1
+        fortschritt.fehler += 1
+        print(f"Zeile {nr}: {meldung} (übersprungen)", file=sys.stderr)
+
+    abdeckung = Abdeckung()
+    eintraege = lies_eintraege(args.eingabe, args.format, fehler=zeilenfehler)
+    jobs_iter = abdeckung.erfassen(auftraege(eintraege, args.ausgabe, args.profil, args.bundesland))
+    if args.nur_tagesblatt:
+        jobs_iter = (a for a in jobs_iter if a[0] == "tagesblatt")
+    elif args.nur_woche:
+        jobs_iter = (a for a in jobs_iter if a[0] == "woche")
+
+    manifest = abgleich.Manifest(args.ausgabe)
+    try:
+        if args.plan:
+            for art, pfad, kwargs, fp in abgleich.geaendert(jobs_iter, manifest, args.profil):
+                print(pfad)
+            _veraltete_melden(abdeckung.veraltet(args.ausgabe, manifest))
+            return 1 if fortschritt.fehler else 0
+
+        ergebnis = lauf(jobs_iter, jobs=args.jobs, force=args.force, profil=args.profil,
+                        fortschritt=fortschritt, manifest=manifest,
+                        max_rss_mb=args.max_rss_mb, diagnose_an=args.diagnose)
+    except (OSError, ValueError) as e:
+        # Eingabe nicht lesbar oder nicht wochenweise zusammenhängend
+        print(f"Abbruch: {e}", file=sys.stderr)
+        return 2
+
+    veraltet = abdeckung.veraltet(args.ausgabe, manifest)
+    if args.aufraeumen and veraltet and not eingabefehler:
+        for pfad in veraltet:
+            manifest.entfernen(pfad)
+        manifest.speichern()
+        print(f"{len(veraltet)} veraltete Dokumente entfernt", file=sys.stderr)
+    else:
+        # mit Eingabefehlern nichts löschen: übersprungene Zeilen erscheinen sonst als veraltet
+        _veraltete_melden(veraltet)
+    return 1 if ergebnis.fehler else 0
+
+
+def _veraltete_melden(veraltet: list[str]):
+    if not veraltet:
+        return
+    print(f"{len(veraltet)} veraltete Dokumente (von der Eingabe nicht mehr erzeugt; "
+          f"--aufraeumen entfernt sie):", file=sys.stderr)
+    for pfad in veraltet:
+        print(f"  {pfad}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
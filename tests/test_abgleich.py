@@ -0,0 +1,99 @@
+import json
+from datetime import date
+
+import pytest
+
+import abgleich
+import stapel
+
+EINGABE = (
+    "datum,start,stop,taetigkeiten\n"
+    "2025-09-15,08:00,16:30,Aufmaß\n"
+    "2025-09-16,08:00,16:30,Dokumentation\n"
+    "2025-09-22,08:00,16:30,Abnahme\n"
+)
+
+
+@pytest.fixture
+def lauf(tmp_path, capsys):
+    """Führt stapel.main aus; liefert (Rückgabewert, stdout, stderr)."""
+    def ausfuehren(eingabe: str, *optionen):
+        pfad = tmp_path / "eintraege.csv"
+        pfad.write_text(eingabe, encoding="utf-8")
+        rc = stapel.main([str(pfad), "-o", str(tmp_path / "out"), "-j", "1", *optionen])
+        out, err = capsys.readouterr()
+        return rc, out.splitlines(), err
+    return ausfuehren
+
+
+def test_fingerabdruck_stabil():
+    kwargs = {"kw_str": "KW 38 – 2025", "week_data": [("Mo", 8.0, None)], "woche": date(2025, 9, 15)}
+    fp = abgleich.fingerabdruck("woche", kwargs)
+    assert fp == abgleich.fingerabdruck("woche", dict(reversed(list(kwargs.items()))))
+    assert fp != abgleich.fingerabdruck("woche", {**kwargs, "week_data": [("Mo", 8.5, None)]})
+    assert fp != abgleich.fingerabdruck("tagesblatt", kwargs)
+    assert fp != abgleich.fingerabdruck("woche", kwargs, "teilzeit_30")
+
+
+def test_plan_nur_geaenderter_tag(tmp_path, lauf):
+    rc, _, _ = lauf(EINGABE)
+    assert rc == 0
+    rc, geaendert, _ = lauf(EINGABE, "--plan")
+    assert geaendert == []
+
+    korrigiert = EINGABE.replace("2025-09-16,08:00,16:30", "2025-09-16,08:00,17:00")
+    rc, geaendert, _ = lauf(korrigiert, "--plan")
+    out = tmp_path / "out"
+    assert geaendert == [str(out / "tagesblatt" / "2025-09-16.pdf"), str(out / "woche" / "2025-W38.pdf")]
+
+
+def test_manifest_beschaedigt(tmp_path, capsys):
+    (tmp_path / abgleich.MANIFEST_NAME).write_text('{"tagesblatt/2025', encoding="utf-8")
+    manifest = abgleich.Manifest(str(tmp_path))
+    assert len(manifest) == 0
+    assert "unlesbar" in capsys.readouterr().err
+    manifest.speichern()
+    assert json.loads((tmp_path / abgleich.MANIFEST_NAME).read_text(encoding="utf-8")) == {}
+
+
+def test_lauf_mit_beschaedigtem_manifest(tmp_path, lauf):
+    lauf(EINGABE)
+    (tmp_path / "out" / abgleich.MANIFEST_NAME).write_text("[]", encoding="utf-8")
+    rc, _, err = lauf(EINGABE)
+    assert rc == 0
+    assert "5 erstellt" in err
+
+
+def test_veraltete_dokumente(tmp_path, lauf):
+    lauf(EINGABE)
+    out = tmp_path / "out"
+    verschoben = EINGABE.replace("2025-09-16", "2025-09-17")
+    veraltet = out / "tagesblatt" / "2025-09-16.pdf"
+
+    rc, _, err = lauf(verschoben, "--plan")
+    assert str(veraltet) in err
+
+    abdeckung = stapel.Abdeckung()
+    for _ in abdeckung.erfassen(stapel.auftraege(
+            stapel.lies_eintraege(str(tmp_path / "eintraege.csv")), str(out), None, None)):
+        pass
+    assert abdeckung.wochen == {(2025, 38), (2025, 39)}
+    manifest = abgleich.Manifest(str(out))
+    assert abdeckung.veraltet(str(out), manifest) == [str(veraltet)]
+
+    # Melden allein löscht nichts; --aufraeumen entfernt Datei und Manifest-Eintrag ohne Neu-Rendern
+    rc, _, err = lauf(verschoben)
+    assert veraltet.exists() and "1 veraltete Dokumente" in err
+    rc, _, err = lauf(verschoben, "--aufraeumen")
+    assert rc == 0
+    assert not veraltet.exists()
+    assert "0 erstellt" in err
+    assert "tagesblatt/2025-09-16.pdf" not in json.loads((out / abgleich.MANIFEST_NAME).read_text("utf-8"))
+
+
+def test_aufraeumen_nicht_bei_eingabefehlern(tmp_path, lauf):
+    lauf(EINGABE)
+    fehlerhaft = EINGABE.replace("2025-09-16,08:00,16:30", "2025-09-16,8 Uhr,16:30")
+    rc, _, err = lauf(fehlerhaft, "--aufraeumen")
+    assert rc == 1
+    assert (tmp_path / "out" / "tagesblatt" / "2025-09-16.pdf").exists()
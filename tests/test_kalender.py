@@ -0,0 +1,126 @@
+from datetime import date, timedelta
+
+import pytest
+
+import kalender
+import regeln
+
+
+def _ostern_carter(jahr: int) -> date:
+    # unabhängige Referenz: Carter-Algorithmus (gültig 1900–2099)
+    b = 225 - 11 * (jahr % 19)
+    d = (b - 21) % 30 + 21
+    if d > 48:
+        d -= 1
+    e = (jahr + jahr // 4 + d + 1) % 7
+    q = d + 7 - e
+    return date(jahr, 3, q) if q < 32 else date(jahr, 4, q - 31)
+
+
+@pytest.mark.parametrize("jahr", range(1954, 2050))
+def test_ostersonntag(jahr):
+    ostern = kalender.ostersonntag(jahr)
+    assert ostern == _ostern_carter(jahr)
+    assert ostern.weekday() == 6
+
+
+@pytest.mark.parametrize("jahr, erwartet", [
+    # Ausnahmejahre der einfachen Gaußschen Formel
+    (1954, date(1954, 4, 18)),
+    (1981, date(1981, 4, 19)),
+    (2049, date(2049, 4, 18)),
+    (2024, date(2024, 3, 31)),
+    (2025, date(2025, 4, 20)),
+])
+def test_ostersonntag_bekannte_daten(jahr, erwartet):
+    assert kalender.ostersonntag(jahr) == erwartet
+
+
+@pytest.mark.parametrize("jahr, erwartet", [
+    (2017, date(2017, 11, 22)),
+    (2021, date(2021, 11, 17)),
+    (2022, date(2022, 11, 16)),
+    (2023, date(2023, 11, 22)),
+    (2024, date(2024, 11, 20)),
+    (2025, date(2025, 11, 19)),
+])
+def test_buss_und_bettag(jahr, erwartet):
+    assert kalender.feiertag(erwartet, "SN") == "Buß- und Bettag"
+    assert kalender.feiertag(erwartet, "BY") is None
+    assert kalender.feiertag(erwartet) is None
+
+
+@pytest.mark.parametrize("jahr", range(1954, 2050))
+def test_buss_und_bettag_mittwoch_vor_23_november(jahr):
+    tag = next(t for t, name in kalender.feiertage(jahr, "SN").items() if name == "Buß- und Bettag")
+    assert tag.weekday() == 2
+    assert date(jahr, 11, 16) <= tag <= date(jahr, 11, 22)
+
+
+def test_feiertage_je_land():
+    bund = kalender.feiertage(2025)
+    assert len(bund) == 9
+    assert bund[date(2025, 10, 3)] == "Tag der Deutschen Einheit"
+    by = kalender.feiertage(2025, "by")
+    assert by[date(2025, 6, 19)] == "Fronleichnam"
+    assert date(2025, 6, 19) not in bund
+    assert kalender.feiertag(date(2025, 5, 8), "BE") == "Tag der Befreiung"
+    assert kalender.feiertag(date(2024, 5, 8), "BE") is None
+
+
+def test_unbekanntes_bundesland():
+    with pytest.raises(ValueError):
+        kalender.feiertage(2025, "XX")
+
+
+def test_kw_label_iso_jahr():
+    assert kalender.kw_label(date(2025, 9, 15)) == "KW 38 – 2025"
+    assert kalender.kw_label(date(2020, 12, 31)) == "KW 53 – 2020"
+    assert kalender.kw_label(date(2027, 1, 1)) == "KW 53 – 2026"
+
+
+def test_parse_kw_label():
+    assert kalender.parse_kw_label("KW 38 – 2025") == (2025, 38)
+    assert kalender.parse_kw_label("KW 53 - 2020") == (2020, 53)
+    assert kalender.parse_kw_label("KW 53 – 2025") is None  # 2025 hat 52 ISO-Wochen
+    assert kalender.parse_kw_label("Woche 3") is None
+
+
+def test_woche_ergaenzen():
+    week_data = [(day, 8.0, None) for day in kalender.WOCHENTAGE_KURZ[:5]]
+    week_data[0] = ("Mo", None, "Urlaub")
+    # KW 40/2025: Fr 03.10. Tag der Deutschen Einheit
+    ergebnis = kalender.woche_ergaenzen(week_data, 2025, 40)
+    assert ergebnis[0] == ("Mo", None, "Urlaub")
+    assert ergebnis[4] == ("Fr", 8.0, "Feiertag")
+    assert [s for _, _, s in ergebnis[1:4]] == [None, None, None]
+
+
+def test_wochentage():
+    tage = kalender.wochentage(2025, 1)
+    assert tage[0] == date(2024, 12, 30)
+    assert tage[-1] - tage[0] == timedelta(days=6)
+    assert len(kalender.jahreswochen(2020)) == 53
+
+
+def test_woche_ergaenzen_feiertag_am_wochenende():
+    # KW 40/2026: Sa 03.10. Tag der Deutschen Einheit – keine Gutschrift ohne Sollzeit
+    week_data = [(day, 8.0, None) for day in kalender.WOCHENTAGE_KURZ[:5]]
+    week_data += [("Sa", None, None), ("So", None, None)]
+    ergebnis = kalender.woche_ergaenzen(week_data, 2026, 40)
+    assert [s for _, _, s in ergebnis] == [None] * 7
+    werte = regeln.regelwerk("standard").woche(ergebnis)
+    assert werte.all_hours == 40.0
+    assert werte.overtime == 0.0
+
+
+def test_woche_ergaenzen_ostersonntag_mit_arbeit():
+    # KW 14/2026, BB: Ostersonntag 05.04. ist Feiertag, zählt aber als Sonntagsarbeit
+    week_data = [(day, 8.0, None) for day in kalender.WOCHENTAGE_KURZ[:4]]
+    week_data += [("Fr", None, None), ("Sa", None, None), ("So", 4.0, None)]
+    ergebnis = kalender.woche_ergaenzen(week_data, 2026, 14, "BB")
+    assert ergebnis[4] == ("Fr", None, "Feiertag")  # Karfreitag
+    assert ergebnis[6] == ("So", 4.0, None)
+    werte = regeln.regelwerk("standard").woche(ergebnis)
+    assert (werte.sun_hours, werte.feiertag_tage) == (4.0, ())
+    assert werte.all_hours == 44.0
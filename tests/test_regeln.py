@@ -0,0 +1,139 @@
+import hashlib
+from datetime import datetime
+
+import pytest
+from reportlab import rl_config
+
+import regeln
+from arbeitstagebuch_standard_python_skripte_tagesblatt_wochenubersicht import (
+    generate_tagesblatt,
+    generate_wochenuebersicht,
+)
+
+WOCHE_1 = [("Mo", 8.5, None), ("Di", 8.0, None), ("Mi", None, "Urlaub"), ("Do", 9.0, None),
+           ("Fr", 7.5, None), ("Sa", 4.0, None), ("So", 2.0, None)]
+WOCHE_2 = [("Mo", 8.0, "Feiertag"), ("Di", None, "Krank"), ("Mi", 8.0, None), ("Do", 8.0, None),
+           ("Fr", 6.0, "Feiertag"), ("Sa", None, None), ("So", None, None)]
+
+
+@pytest.fixture
+def standard():
+    return regeln.regelwerk("standard")
+
+
+@pytest.fixture
+def schicht():
+    return regeln.regelwerk("schicht_arbzg")
+
+
+def test_parse_uhrzeit():
+    assert regeln.parse_uhrzeit("08:30 Uhr") == 8.5
+    assert regeln.parse_uhrzeit("17:45") == 17.75
+    with pytest.raises(ValueError):
+        regeln.parse_uhrzeit("8 Uhr")
+
+
+def test_standard_pause_und_ueberstunden(standard):
+    werte = standard.tag("08:00 Uhr", "17:30 Uhr", day="Mo")
+    assert (werte.gesamtzeit, werte.pause, werte.arbeitszeit, werte.ueberstunden) == (9.5, 0.5, 9.0, 1.0)
+    assert standard.tag("08:00", "12:00", 0.25).arbeitszeit == 3.75
+    assert standard.tag("08:00", "08:15", 0.5).arbeitszeit == 0.0  # nie negativ
+
+
+@pytest.mark.parametrize("gesamtzeit, pause", [
+    (5.0, 0.0), (6.0, 0.0), (6.25, 0.5), (9.0, 0.5), (9.25, 0.75), (11.0, 0.75),
+])
+def test_arbzg_pausenstufen(schicht, gesamtzeit, pause):
+    # Pausenschwellen sind exklusiv: genau 6 Std. brauchen noch keine Pause
+    assert schicht.pause(gesamtzeit) == pause
+
+
+def test_teilzeit_tagessoll_und_gutschrift():
+    teilzeit = regeln.regelwerk("teilzeit_30")
+    assert teilzeit.wochensoll == 30.0
+    assert teilzeit.gutschrift("Mi") == 6.0  # gutschrift null -> Tagessoll
+    assert teilzeit.tag("08:00", "14:30", day="Di").ueberstunden == 0.0
+
+
+def test_woche_standard(standard):
+    werte = standard.woche(WOCHE_1)
+    assert werte.weekday_hours == 41.0
+    assert werte.all_hours == 47.0
+    assert werte.overtime == 1.0
+    assert (werte.sat_hours, werte.sun_hours) == (4.0, 2.0)
+    assert werte.zuschlag_hours == 0.0
+
+
+def test_woche_feiertagsarbeit_und_zuschlaege(schicht):
+    werte = schicht.woche(WOCHE_2)
+    assert werte.feiertag_tage == ("Mo", "Fr")
+    assert werte.feiertag_sum == 14.0
+    assert werte.weekday_hours == 40.0  # Gutschriften statt tatsächlicher Feiertagsarbeit
+    assert werte.zuschlag_hours == 14.0
+    assert schicht.woche(WOCHE_1).zuschlag_hours == 4.0 * 0.25 + 2.0 * 0.5
+
+
+def test_unbekanntes_profil():
+    with pytest.raises(ValueError):
+        regeln.regelwerk("gibt_es_nicht")
+
+
+def test_regelwerk_wird_wiederverwendet():
+    assert regeln.regelwerk("standard") is regeln.regelwerk("standard")
+
+
+# ---------- Standardprofil: PDFs bytegleich zum Stand vor den Regelprofilen ----------
+# sha256 der Ausgabe des ursprünglichen Generators (ReportLab 4.2.2, invariant=1)
+BASELINE = {
+    "woche_1": "f227a7ff5b782c67400df281891d199520d1e7eb80e94a9bee2e67bfcd978c1c",
+    "woche_2": "9346bb3cd3481228caa2d7f35e9db854dc45d104d269b80f0bb36f776af75283",
+    "tag_1": "d94da67e546fa92bd6d7597977f6ea90d6f6929c31515466fb00f8f0517c03ba",
+    "tag_2": "61aab95448a0390d2d1eeeaac0b709bf7e45a633907f7b4d8d93c1052320b790",
+}
+
+
+@pytest.fixture
+def invariant(monkeypatch):
+    monkeypatch.setattr(rl_config, "invariant", 1)
+
+
+def _sha256(pfad) -> str:
+    return hashlib.sha256(pfad.read_bytes()).hexdigest()
+
+
+@pytest.mark.parametrize("name, week_data", [("woche_1", WOCHE_1), ("woche_2", WOCHE_2)])
+def test_wochenuebersicht_bytegleich(tmp_path, invariant, name, week_data):
+    pfad = tmp_path / f"{name}.pdf"
+    generate_wochenuebersicht(str(pfad), "KW 38 – 2025", week_data, created_date=datetime(2025, 9, 20))
+    assert _sha256(pfad) == BASELINE[name]
+
+
+@pytest.mark.parametrize("name, args, kwargs", [
+    ("tag_1", ("Samstag, 30.08.2025", "KW 35 – 2025", "08:00 Uhr", "17:30 Uhr", 0.5), {}),
+    # ohne Pausenangabe: früher fest 0,5 Std., jetzt Pausenregel des Standardprofils
+    ("tag_2", ("Dienstag, 16.09.2025", "KW 38 – 2025", "07:15 Uhr", "16:00 Uhr"),
+     {"taetigkeiten": ["Aufmaß", "Dokumentation"]}),
+])
+def test_tagesblatt_bytegleich(tmp_path, invariant, name, args, kwargs):
+    pfad = tmp_path / f"{name}.pdf"
+    generate_tagesblatt(str(pfad), *args, **kwargs)
+    assert _sha256(pfad) == BASELINE[name]
+
+
+@pytest.mark.parametrize("tage, text", [
+    (["Mo", "Di", "Mi", "Do", "Fr"], "Mo–Fr"),
+    (["Sa", "Mo", "Di", "Mi", "Do", "Fr"], "Mo–Sa"),
+    (["Di", "Do"], "Di+Do"),
+    (["Mo", "Di", "Do"], "Mo+Di+Do"),
+])
+def test_tage_text(tage, text):
+    assert regeln.tage_text(tage) == text
+
+
+def test_profil_beschriftung_und_wochensoll(tmp_path):
+    pfad = tmp_path / "regeln.json"
+    pfad.write_text('{"frei": {"ueberstunden_tage": ["Mo", "Di", "Mi"], "wochensoll": 0}}', encoding="utf-8")
+    regelwerk = regeln.regelwerk("frei", str(pfad))
+    assert regelwerk.ueberstunden_text == "Mo–Mi"
+    assert regelwerk.wochensoll == 0.0  # explizit 0 ist nicht "nicht gesetzt"
+    assert regeln.regelwerk("standard").ueberstunden_text == "Mo–Fr"
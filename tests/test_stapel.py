@@ -0,0 +1,90 @@
+from datetime import date
+
+import pytest
+
+import stapel
+
+
+def _eintrag(datum, start=None, stop=None, pause=None, hours=None, special=None, taetigkeiten=()):
+    return {"datum": date.fromisoformat(datum), "start": start, "stop": stop, "pause": pause,
+            "hours": hours, "special": special, "taetigkeiten": list(taetigkeiten)}
+
+
+def test_tag_bloecke_und_luecken():
+    tag = stapel._tag(date(2025, 9, 15), [
+        _eintrag("2025-09-15", "13:00", "17:30", taetigkeiten=["B"]),
+        _eintrag("2025-09-15", "08:00", "12:00", taetigkeiten=["A"]),
+    ])
+    assert (tag["start"], tag["stop"]) == ("08:00", "17:30")
+    assert tag["luecken"] == 1.0
+    assert tag["pause"] is None
+    assert tag["taetigkeiten"] == ["B", "A"]
+
+
+def test_tag_ueberlappende_bloecke():
+    tag = stapel._tag(date(2025, 9, 15), [
+        _eintrag("2025-09-15", "08:00", "12:00", pause=0.25),
+        _eintrag("2025-09-15", "11:00", "13:00", pause=0.25),
+        _eintrag("2025-09-15", "14:00", "16:00"),
+    ])
+    assert (tag["start"], tag["stop"]) == ("08:00", "16:00")
+    assert tag["luecken"] == 1.0
+    assert tag["pause"] == 0.5
+
+
+def test_wochen_fasst_verstreute_tage_zusammen():
+    eintraege = [
+        _eintrag("2025-09-15", "08:00", "12:00"),
+        _eintrag("2025-09-16", "08:00", "16:00"),
+        _eintrag("2025-09-15", "13:00", "17:30"),
+        _eintrag("2025-09-22", "08:00", "16:00"),
+    ]
+    wochen = list(stapel.wochen(eintraege))
+    assert [key for key, _ in wochen] == [(2025, 38), (2025, 39)]
+    tage = wochen[0][1]
+    assert [t["datum"] for t in tage] == [date(2025, 9, 15), date(2025, 9, 16)]
+    assert tage[0]["luecken"] == 1.0
+
+
+def test_wochen_nicht_zusammenhaengend():
+    eintraege = [
+        _eintrag("2025-09-15", "08:00", "12:00"),
+        _eintrag("2025-09-22", "08:00", "12:00"),
+        _eintrag("2025-09-16", "08:00", "12:00"),
+    ]
+    with pytest.raises(ValueError, match="KW 38/2025"):
+        list(stapel.wochen(eintraege))
+
+
+def test_auftraege_luecke_ist_pause():
+    eintraege = [_eintrag("2025-09-15", "08:00", "12:00"), _eintrag("2025-09-15", "13:00", "17:30")]
+    tagesblatt, woche = stapel.auftraege(eintraege, "out", None, None)
+    assert tagesblatt[2]["pause_std"] == 1.0
+    assert woche[2]["week_data"][0] == ("Mo", 8.5, None)
+
+
+def test_lies_eintraege_meldet_zeilen(tmp_path):
+    pfad = tmp_path / "e.csv"
+    pfad.write_text(
+        "datum,start,stop,pause\n"
+        "2025-09-15,08:00,12:00,\n"
+        "2025-09-16,8 Uhr,16:00,\n"
+        ",08:00,16:00,\n"
+        "2025-09-18,08:00,16:00,abc\n",
+        encoding="utf-8",
+    )
+    fehler = []
+    eintraege = list(stapel.lies_eintraege(str(pfad), fehler=lambda nr, m: fehler.append(nr)))
+    assert [e["datum"] for e in eintraege] == [date(2025, 9, 15)]
+    assert fehler == [3, 4, 5]
+    with pytest.raises(ValueError, match="Zeile 3"):
+        list(stapel.lies_eintraege(str(pfad)))
+
+
+def test_unbekanntes_bundesland(tmp_path, capsys):
+    pfad = tmp_path / "e.csv"
+    pfad.write_text("datum,start,stop\n2025-09-15,08:00,12:00\n", encoding="utf-8")
+    with pytest.raises(SystemExit):
+        stapel.main([str(pfad), "-o", str(tmp_path / "out"), "--bundesland", "XX"])
+    assert "Unbekanntes Bundesland" in capsys.readouterr().err
+    assert not (tmp_path / "out").exists()
@@ -0,0 +1,170 @@
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+import zugang
+from zugang import LANE_BATCH, LANE_INTERAKTIV, RenderSlots, TokenBucket
+
+
+class Uhr:
+    def __init__(self):
+        self.jetzt = 1000.0
+
+    def __call__(self):
+        return self.jetzt
+
+
+@pytest.fixture
+def uhr(monkeypatch):
+    uhr = Uhr()
+    monkeypatch.setattr(zugang.time, "monotonic", uhr)
+    return uhr
+
+
+# ---------- TokenBucket ----------
+def test_bucket_burst_dann_wartezeit(uhr):
+    bucket = TokenBucket(rate=2, burst=3)
+    assert [bucket.nehmen() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.nehmen() == pytest.approx(0.5)
+
+
+def test_bucket_fuellt_nach(uhr):
+    bucket = TokenBucket(rate=2, burst=3)
+    for _ in range(3):
+        bucket.nehmen()
+    uhr.jetzt += 0.5
+    assert bucket.nehmen() == 0.0
+    assert bucket.nehmen() > 0
+    uhr.jetzt += 60  # nie mehr als burst angespart
+    assert [bucket.nehmen() > 0 for _ in range(4)] == [False, False, False, True]
+
+
+def test_bucket_ohne_rate(uhr):
+    bucket = TokenBucket(rate=0, burst=1)
+    assert bucket.nehmen() == 0.0
+    assert bucket.nehmen() == float("inf")
+
+
+# ---------- RenderSlots ----------
+def test_reserve_bleibt_interaktiv():
+    slots = RenderSlots(3, reserve=1)
+    assert slots.belegen(LANE_BATCH, 0)
+    assert slots.belegen(LANE_BATCH, 0)
+    assert not slots.belegen(LANE_BATCH, 0)  # letzter Slot ist reserviert
+    assert slots.belegen(LANE_INTERAKTIV, 0)
+    assert not slots.belegen(LANE_INTERAKTIV, 0)
+    slots.freigeben(LANE_BATCH)
+    assert slots.status()["aktiv"] == {LANE_INTERAKTIV: 1, LANE_BATCH: 1}
+
+
+def test_reserve_kleiner_als_slots():
+    slots = RenderSlots(1, reserve=5)
+    assert slots.reserve == 0
+    assert slots.belegen(LANE_BATCH, 0)
+
+
+def test_wartende_interaktive_vor_batch():
+    slots = RenderSlots(2, reserve=0)
+    assert slots.belegen(LANE_BATCH, 0)
+    assert slots.belegen(LANE_BATCH, 0)
+    ergebnis = {}
+
+    def warten(lane, timeout):
+        ergebnis[lane] = slots.belegen(lane, timeout)
+
+    batch = threading.Thread(target=warten, args=(LANE_BATCH, 1.0))
+    interaktiv = threading.Thread(target=warten, args=(LANE_INTERAKTIV, 5.0))
+    batch.start()
+    interaktiv.start()
+    frist = time.monotonic() + 5
+    while slots.status()["wartend_interaktiv"] == 0 and time.monotonic() < frist:
+        time.sleep(0.01)
+    slots.freigeben(LANE_BATCH)
+    # der freie Slot geht an die wartende interaktive Anfrage, obwohl Stapelarbeit länger wartet
+    interaktiv.join(5)
+    batch.join(5)
+    assert ergebnis == {LANE_INTERAKTIV: True, LANE_BATCH: False}
+
+
+# ---------- Admin-Endpunkte ----------
+@pytest.fixture
+def admin_client():
+    app = Flask(__name__)
+
+    @app.route("/admin")
+    @zugang.admin
+    def admin():
+        return "ok"
+
+    return app.test_client()
+
+
+def test_admin_offen_gesperrt(monkeypatch, admin_client):
+    monkeypatch.setattr(zugang, "CLIENTS", {})
+    monkeypatch.setattr(zugang, "ADMIN_KEY", None)
+    assert admin_client.get("/admin").status_code == 403
+
+
+def test_admin_key(monkeypatch, admin_client):
+    monkeypatch.setattr(zugang, "CLIENTS", {"k1": zugang.Client("lohn")})
+    monkeypatch.setattr(zugang, "ADMIN_KEY", "geheim")
+    assert admin_client.get("/admin").status_code == 401
+    assert admin_client.get("/admin", headers={"Authorization": "Bearer falsch"}).status_code == 401
+    assert admin_client.get("/admin", headers={"Authorization": "Bearer k1"}).status_code == 403
+    assert admin_client.get("/admin", headers={"Authorization": "Bearer geheim"}).status_code == 200
+
+
+def test_admin_client(monkeypatch, admin_client):
+    monkeypatch.setattr(zugang, "CLIENTS", {"k2": zugang.Client("ops", admin=True)})
+    monkeypatch.setattr(zugang, "ADMIN_KEY", None)
+    assert admin_client.get("/admin", headers={"Authorization": "Bearer k2"}).status_code == 200
+
+
+# ---------- Render-Endpunkte ----------
+@pytest.fixture
+def render_client():
+    app = Flask(__name__)
+
+    @app.route("/render", methods=["POST"])
+    @zugang.render
+    def render():
+        return "ok"
+
+    return app.test_client()
+
+
+def test_render_ratenlimit(monkeypatch, uhr, render_client):
+    monkeypatch.setattr(zugang, "CLIENTS", {"k": zugang.Client("lohn", rate=0.5, burst=1)})
+    headers = {"Authorization": "Bearer k"}
+    assert render_client.post("/render", headers=headers).status_code == 200
+    resp = render_client.post("/render", headers=headers)
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == "2"
+
+
+def test_render_ohne_rate(monkeypatch, render_client):
+    monkeypatch.setattr(zugang, "CLIENTS", {"k": zugang.Client("gesperrt", rate=0, burst=1)})
+    headers = {"Authorization": "Bearer k"}
+    assert render_client.post("/render", headers=headers).status_code == 200
+    assert render_client.post("/render", headers=headers).status_code == 403
+    assert render_client.post("/render").status_code == 401
+
+
+def test_batch_warteschlange_begrenzt():
+    slots = RenderSlots(2, reserve=1, max_wartend_batch=1)
+    assert slots.belegen(LANE_BATCH, 0)
+    ergebnis = {}
+    wartet = threading.Thread(target=lambda: ergebnis.update(ok=slots.belegen(LANE_BATCH, 5)))
+    wartet.start()
+    frist = time.monotonic() + 5
+    while slots.status()["wartend_batch"] == 0 and time.monotonic() < frist:
+        time.sleep(0.01)
+    start = time.monotonic()
+    assert not slots.belegen(LANE_BATCH, 5)  # Warteschlange voll: sofort abgewiesen
+    assert time.monotonic() - start < 1
+    assert slots.belegen(LANE_INTERAKTIV, 0)  # Reserve bleibt erreichbar
+    slots.freigeben(LANE_BATCH)
+    wartet.join(5)
+    assert ergebnis == {"ok": True}
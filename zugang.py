@@ -0,0 +1,293 @@
+# ===============================================
+# Datei: zugang.py
+# Zugangskontrolle für die Render-Endpunkte: API-Keys je Client,
+# Token-Bucket-Ratenlimit, Parallelitätsgrenze je Client und
+# bevorzugte Spur ("interaktiv") gegenüber Stapelarbeit ("batch").
+#
+# Konfiguration (Umgebungsvariablen):
+#   ATB_CLIENTS        Pfad zu einer JSON-Datei oder JSON-Text:
+#                      {"<api-key>": {"name": "lohn", "rate": 2, "burst": 10,
+#                                     "max_parallel": 2, "lane": "batch", "admin": false}}
+#   ATB_API_KEY        einzelner Key (wie alt/server.py), wenn ATB_CLIENTS fehlt
+#   ATB_ADMIN_KEY      Key für /admin/* (zusätzlich zu Clients mit "admin": true)
+#   ATB_RENDER_SLOTS   gleichzeitige Renderings insgesamt (Standard: CPU-Anzahl)
+#   ATB_RESERVE        davon für interaktive Anfragen reserviert (Standard: 1)
+#   ATB_SLOT_TIMEOUT   max. Wartezeit auf einen freien Slot in Sekunden (Standard: 30)
+#   ATB_BATCH_WARTEND  max. gleichzeitig auf einen Slot wartende Stapel-Anfragen
+#                      (Standard: ATB_RENDER_SLOTS); weitere werden sofort mit 503 abgewiesen
+# Alle Zähler (Buckets, Parallelität, Slots) leben im Prozess: sie gelten nur dann
+# für den ganzen Server, wenn er mit genau einem Worker läuft (gunicorn.conf.py).
+# Die Threads dieses Workers müssen die aktiven und wartenden Stapel-Anfragen
+# übersteigen, sonst erreichen interaktive Anfragen den reservierten Slot nie.
+# Ohne Keys ist die API offen; Clients werden dann nach IP-Adresse begrenzt
+# (hinter einem Proxy: ATB_PROXY_HOPS in server.py setzen, sonst zählt die Proxy-IP).
+# Admin-Endpunkte sind nie offen: ohne Admin-Key bzw. Admin-Client antworten sie mit 403.
+# ===============================================
+import hmac
+import json
+import math
+import os
+import threading
+import time
+from functools import wraps
+
+from flask import g, jsonify, request
+
+LANE_INTERAKTIV = "interaktiv"
+LANE_BATCH = "batch"
+
+# Standardwerte für Clients ohne eigene Angaben
+DEFAULT_RATE = float(os.environ.get("ATB_RATE", 10))       # Anfragen pro Sekunde
+DEFAULT_BURST = float(os.environ.get("ATB_BURST", 20))
+DEFAULT_MAX_PARALLEL = int(os.environ.get("ATB_MAX_PARALLEL", 4))
+
+
+class TokenBucket:
+    """Token-Bucket: `rate` Token pro Sekunde, höchstens `burst` Token angespart."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = float(burst)
+        self._stand = time.monotonic()
+        self._lock = threading.Lock()
+
+    def nehmen(self) -> float:
+        """Nimmt ein Token. Rückgabe 0.0 = erlaubt, sonst Sekunden bis zum nächsten Token."""
+        with self._lock:
+            jetzt = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (jetzt - self._stand) * self.rate)
+            self._stand = jetzt
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return 0.0
+            return (1.0 - self._tokens) / self.rate if self.rate > 0 else float("inf")
+
+
+class Client:
+    def __init__(self, name: str, rate: float = DEFAULT_RATE, burst: float = DEFAULT_BURST,
+                 max_parallel: int = DEFAULT_MAX_PARALLEL, lane: str | None = None, admin: bool = False):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.max_parallel = int(max_parallel)
+        self.lane = lane  # None = per Header wählbar, "batch" = immer Stapelspur
+        self.admin = bool(admin)
+        self.aktiv = 0
+        self.abgelehnt = 0
+        self._lock = threading.Lock()
+
+    def belegen(self) -> bool:
+        with self._lock:
+            if self.aktiv >= self.max_parallel:
+                return False
+            self.aktiv += 1
+            return True
+
+    def freigeben(self):
+        with self._lock:
+            self.aktiv -= 1
+
+    def status(self) -> dict:
+        return {
+            "aktiv": self.aktiv,
+            "max_parallel": self.max_parallel,
+            "rate": self.bucket.rate,
+            "burst": self.bucket.burst,
+            "lane": self.lane or LANE_INTERAKTIV,
+            "abgelehnt": self.abgelehnt,
+        }
+
+
+class RenderSlots:
+    """
+    Globale Render-Slots mit Priorität: `reserve` Slots bleiben interaktiven
+    Anfragen vorbehalten, und Stapelarbeit wartet, solange interaktive Anfragen warten.
+    """
+
+    def __init__(self, slots: int, reserve: int = 1, max_wartend_batch: int | None = None):
+        self.slots = max(1, slots)
+        self.reserve = min(max(0, reserve), self.slots - 1)
+        # wartende Stapel-Anfragen blockieren je einen Server-Thread -> begrenzen
+        self.max_wartend_batch = self.slots if max_wartend_batch is None else max(0, max_wartend_batch)
+        self.aktiv = {LANE_INTERAKTIV: 0, LANE_BATCH: 0}
+        self._wartend_interaktiv = 0
+        self._wartend_batch = 0
+        self._cond = threading.Condition()
+
+    def _frei(self, lane: str) -> bool:
+        gesamt = self.aktiv[LANE_INTERAKTIV] + self.aktiv[LANE_BATCH]
+        if gesamt >= self.slots:
+            return False
+        if lane == LANE_BATCH:
+            return self._wartend_interaktiv == 0 and self.aktiv[LANE_BATCH] < self.slots - self.reserve
+        return True
+
+    def belegen(self, lane: str, timeout: float) -> bool:
+        with self._cond:
+            if lane == LANE_BATCH and not self._frei(lane) and self._wartend_batch >= self.max_wartend_batch:
+                return False
+            if lane == LANE_INTERAKTIV:
+                self._wartend_interaktiv += 1
+            else:
+                self._wartend_batch += 1
+            try:
+                if not self._cond.wait_for(lambda: self._frei(lane), timeout=timeout):
+                    return False
+                self.aktiv[lane] += 1
+                return True
+            finally:
+                if lane == LANE_INTERAKTIV:
+                    self._wartend_interaktiv -= 1
+                else:
+                    self._wartend_batch -= 1
+
+    def freigeben(self, lane: str):
+        with self._cond:
+            self.aktiv[lane] -= 1
+            self._cond.notify_all()
+
+    def status(self) -> dict:
+        return {
+            "slots": self.slots,
+            "reserve_interaktiv": self.reserve,
+            "aktiv": dict(self.aktiv),
+            "wartend_interaktiv": self._wartend_interaktiv,
+            "wartend_batch": self._wartend_batch,
+            "max_wartend_batch": self.max_wartend_batch,
+        }
+
+
+# ---------------- Konfiguration ---------------- #
+def _lade_clients() -> dict[str, Client]:
+    quelle = os.environ.get("ATB_CLIENTS")
+    if quelle:
+        if os.path.exists(quelle):
+            with open(quelle, encoding="utf-8") as f:
+                cfg = json.load(f)
+        else:
+            cfg = json.loads(quelle)
+        return {key: Client(**{"name": key[:4] + "…", **werte}) for key, werte in cfg.items()}
+    key = os.environ.get("ATB_API_KEY")
+    if key:
+        return {key: Client("default")}
+    return {}
+
+
+CLIENTS = _lade_clients()
+SLOTS = RenderSlots(
+    int(os.environ.get("ATB_RENDER_SLOTS", os.cpu_count() or 4)),
+    int(os.environ.get("ATB_RESERVE", 1)),
+    int(os.environ["ATB_BATCH_WARTEND"]) if os.environ.get("ATB_BATCH_WARTEND") else None,
+)
+SLOT_TIMEOUT = float(os.environ.get("ATB_SLOT_TIMEOUT", 30))
+ADMIN_KEY = os.environ.get("ATB_ADMIN_KEY") or None
+
+_anonym: dict[str, Client] = {}
+_anonym_lock = threading.Lock()
+
+
+def _bearer(req) -> str | None:
+    auth = req.headers.get("Authorization", "")
+    if not auth.startswith("Bearer "):
+        return None
+    return auth[len("Bearer "):].strip()
+
+
+def client_fuer(req) -> Client | None:
+    """Client zur Anfrage (Bearer-Key); None = nicht autorisiert."""
+    if not CLIENTS:
+        addr = req.remote_addr or "-"
+        with _anonym_lock:
+            if addr not in _anonym:
+                if len(_anonym) >= 10000:
+                    # inaktive Einträge verwerfen, damit die Tabelle nicht unbegrenzt wächst
+                    for key in [k for k, c in _anonym.items() if c.aktiv == 0]:
+                        del _anonym[key]
+                _anonym[addr] = Client(addr)
+            return _anonym[addr]
+    key = _bearer(req)
+    return CLIENTS.get(key) if key else None
+
+
+def _lane(client: Client, req) -> str:
+    if client.lane == LANE_BATCH:
+        return LANE_BATCH
+    if req.headers.get("X-ATB-Lane", "").lower() == LANE_BATCH:
+        return LANE_BATCH
+    return LANE_INTERAKTIV
+
+
+def _zu_viele(client: Client, grund: str, retry_after: float):
+    client.abgelehnt += 1
+    resp = jsonify({"error": grund})
+    resp.status_code = 429
+    resp.headers["Retry-After"] = str(max(1, int(retry_after + 0.999)))
+    return resp
+
+
+# ---------------- Decorators ---------------- #
+def admin(f):
+    """
+    Nur mit ATB_ADMIN_KEY oder für Clients mit "admin": true – auch im offenen Modus.
+    Ohne konfigurierten Admin-Zugang sind die Endpunkte gesperrt (403).
+    """
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        if ADMIN_KEY is None and not any(c.admin for c in CLIENTS.values()):
+            return "Forbidden", 403
+        key = _bearer(request)
+        if not key:
+            return "Unauthorized", 401
+        if ADMIN_KEY is not None and hmac.compare_digest(key.encode(), ADMIN_KEY.encode()):
+            g.client = Client("admin", admin=True)
+            return f(*args, **kwargs)
+        client = CLIENTS.get(key)
+        if client is None:
+            return "Unauthorized", 401
+        if not client.admin:
+            return "Forbidden", 403
+        g.client = client
+        return f(*args, **kwargs)
+    return wrapper
+
+
+def render(f):
+    """Zugangskontrolle für Render-Endpunkte: Key, Ratenlimit, Parallelität, Spur."""
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        client = client_fuer(request)
+        if client is None:
+            return "Unauthorized", 401
+        wartezeit = client.bucket.nehmen()
+        if math.isinf(wartezeit):
+            # rate 0: Kontingent aufgebraucht, wird nie wieder aufgefüllt – Warten hilft nicht
+            client.abgelehnt += 1
+            return jsonify({"error": "Kontingent erschöpft"}), 403
+        if wartezeit > 0:
+            return _zu_viele(client, "Ratenlimit überschritten", wartezeit)
+        if not client.belegen():
+            return _zu_viele(client, f"Maximal {client.max_parallel} parallele Anfragen", 1.0)
+        lane = _lane(client, request)
+        try:
+            if not SLOTS.belegen(lane, SLOT_TIMEOUT):
+                resp = jsonify({"error": "Server ausgelastet"})
+                resp.status_code = 503
+                resp.headers["Retry-After"] = "5"
+                return resp
+            try:
+                g.client = client
+                g.lane = lane
+                return f(*args, **kwargs)
+            finally:
+                SLOTS.freigeben(lane)
+        finally:
+            client.freigeben()
+    return wrapper
+
+
+def status() -> dict:
+    clients = list(CLIENTS.values()) or list(_anonym.values())
+    return {
+        "slots": SLOTS.status(),
+        "clients": {c.name: c.status() for c in clients},
+    }